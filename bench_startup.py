@@ -0,0 +1,64 @@
+"""Cold start of a headless worker: each measurement runs in a fresh
+interpreter, as a spawned sweep/evaluation worker would.
+
+    python bench_startup.py [--repeat 5]
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+
+# Each snippet prints the seconds it took, measured inside the child
+SNIPPETS = {
+    "import simulation": """
+import time; t = time.perf_counter()
+import simulation
+print(time.perf_counter() - t)
+""",
+    "import simulation_network": """
+import time; t = time.perf_counter()
+import simulation_network
+print(time.perf_counter() - t)
+""",
+    "first frame (headless)": """
+import time; t = time.perf_counter()
+import neat, simulation
+config = neat.Config(neat.DefaultGenome, neat.DefaultReproduction,
+                     neat.DefaultSpeciesSet, neat.DefaultStagnation, 'neat-config.txt')
+reporters = neat.reporting.ReporterSet()
+reproduction = config.reproduction_type(config.reproduction_config, reporters,
+                                        config.stagnation_type(config.stagnation_config, reporters))
+genome = next(iter(reproduction.create_new(config.genome_type, config.genome_config, 1).values()))
+genome.fitness = 0
+sim = simulation.LaneModelSimulation(genome, config, seed=1)
+sim.update()
+print(time.perf_counter() - t)
+""",
+    "images decoded at import": """
+import sprites
+print(len(sprites._images))
+""",
+}
+
+def measure(code: str, repeat: int) -> list[float]:
+    env = dict(os.environ, SDL_VIDEODRIVER="dummy", PYGAME_HIDE_SUPPORT_PROMPT="1")
+    results = []
+    for _ in range(repeat):
+        out = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True,
+                             env=env, check=True).stdout
+        results.append(float(out.split()[-1]))
+    return results
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Measure the cold start of a headless worker")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    for name, code in SNIPPETS.items():
+        results = measure(code, args.repeat)
+        if name.startswith("images"):
+            print(f"{name:28} {int(results[0])}")
+        else:
+            print(f"{name:28} median {statistics.median(results) * 1000:7.1f} ms"
+                  f"   min {min(results) * 1000:7.1f} ms")
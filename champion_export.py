@@ -0,0 +1,68 @@
+import neat
+
+import concurrent.futures
+import contextlib
+import multiprocessing
+import os
+from genome_codec import decode_genome, encode_genome
+
+def _init_worker():
+    os.environ["MPLBACKEND"] = "Agg" # files only, no window
+    os.environ["SDL_VIDEODRIVER"] = "dummy"
+    os.environ["PYGAME_HIDE_SUPPORT_PROMPT"] = "1"
+
+def export_champion(raw_genome: bytes, path: str):
+    """Writes `path`.txt (the topology listing) and `path`.png. Runs in a worker."""
+    from simulation_network import print_genome_topology
+    genome = decode_genome(raw_genome)
+    with open(path + ".txt", "w") as f, contextlib.redirect_stdout(f):
+        print_genome_topology(genome, None, file_path=path + ".png")
+    return path
+
+class ChampionExporter(neat.reporting.BaseReporter):
+    """Exports the best genome of every generation (topology text and PNG)
+    to `directory` from a pool of worker processes, so rendering never
+    holds up the evolution. With `changed_only` a generation whose
+    champion is the same genome as the previous one is skipped.
+    """
+    def __init__(self, directory: str = "champions", changed_only: bool = False,
+                 workers: int = 1):
+        self.directory = directory
+        self.changed_only = changed_only
+        self.generation = 0
+        self._last_key = None
+        self._pending = []
+        os.makedirs(directory, exist_ok=True)
+        self._executor = concurrent.futures.ProcessPoolExecutor(
+            max_workers=workers, mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_worker)
+
+    def start_generation(self, generation):
+        self.generation = generation
+
+    def post_evaluate(self, config, population, species, best_genome):
+        if self.changed_only and best_genome.key == self._last_key:
+            return
+        self._last_key = best_genome.key
+        path = os.path.join(self.directory, f"gen_{self.generation:04d}_genome_{best_genome.key}")
+        # encoded now: the genome's fitness is reset when the next generation starts
+        raw = encode_genome(best_genome)
+        self._pending.append(self._executor.submit(export_champion, raw, path))
+        self._collect(wait=False)
+
+    def _collect(self, wait: bool):
+        """Reports the exports that failed among those done."""
+        still_pending = []
+        for future in self._pending:
+            if wait or future.done():
+                error = future.exception()
+                if error is not None:
+                    print(f"Champion export failed: {error!r}")
+            else:
+                still_pending.append(future)
+        self._pending = still_pending
+
+    def close(self):
+        """Waits for the queued exports."""
+        self._collect(wait=True)
+        self._executor.shutdown()
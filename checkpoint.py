@@ -0,0 +1,105 @@
+import neat
+
+import glob
+import gzip
+import itertools
+import os
+import pickle
+import random
+import threading
+
+class BackgroundCheckpointer(neat.reporting.BaseReporter):
+    """Saves the whole evolution state every `interval` generations:
+    population, species, the reproduction counters, the best genome so far,
+    the `random` state and whatever `extra_state()` returns (the module
+    globals of the caller, e.g. simulation.generation).
+
+    The state is pickled at the end of the generation, on the main thread,
+    so it is consistent; compressing and writing happen on a background
+    thread while the next generation runs. Files are written to a temporary
+    name and renamed, so a crash never leaves a half-written checkpoint.
+    The writer thread is not a daemon: quitting waits for the last write.
+    """
+    def __init__(self, population: neat.Population, directory: str = "checkpoints",
+                 interval: int = 5, extra_state=None, keep: int = 3):
+        self.population = population
+        self.directory = directory
+        self.interval = interval
+        self.extra_state = extra_state
+        self.keep = keep # older checkpoints are deleted
+        self._writer = None
+        os.makedirs(directory, exist_ok=True)
+
+    def end_generation(self, config, population, species_set):
+        next_generation = self.population.generation + 1
+        if next_generation % self.interval == 0:
+            self.save(next_generation)
+
+    def save(self, next_generation: int):
+        p = self.population
+        next_key = next(p.reproduction.genome_indexer)
+        p.reproduction.genome_indexer = itertools.count(next_key)
+        state = {
+            "generation": next_generation, # next one to be evaluated
+            "config": p.config,
+            "population": p.population,
+            "species": p.species,
+            "next_genome_key": next_key,
+            "ancestors": p.reproduction.ancestors,
+            "best_genome": p.best_genome,
+            "random_state": random.getstate(),
+            "extra": self.extra_state() if self.extra_state is not None else None,
+        }
+        # the reporters (threads, open files...) are not part of the state
+        reporters, p.species.reporters = p.species.reporters, None
+        try:
+            raw = pickle.dumps(state, protocol=pickle.HIGHEST_PROTOCOL)
+        finally:
+            p.species.reporters = reporters
+
+        self.wait() # one write at a time
+        path = os.path.join(self.directory, f"checkpoint-{next_generation:05d}.pkl.gz")
+        self._writer = threading.Thread(target=self._write, args=(path, raw))
+        self._writer.start()
+
+    def _write(self, path: str, raw: bytes):
+        tmp = path + ".tmp"
+        with open(tmp, "wb") as f:
+            f.write(gzip.compress(raw, compresslevel=5))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, path)
+        for old in sorted(glob.glob(os.path.join(self.directory, "checkpoint-*.pkl.gz")))[:-self.keep]:
+            os.remove(old)
+
+    def wait(self):
+        if self._writer is not None:
+            self._writer.join()
+            self._writer = None
+
+def latest_checkpoint(path: str) -> str | None:
+    """`path` itself if it is a file, else the newest checkpoint in that directory."""
+    if os.path.isfile(path):
+        return path
+    checkpoints = sorted(glob.glob(os.path.join(path, "checkpoint-*.pkl.gz")))
+    return checkpoints[-1] if checkpoints else None
+
+def restore_checkpoint(path: str, config: neat.Config | None = None):
+    """Rebuilds the Population saved in `path` and restores the `random`
+    state. Returns (population, extra state)."""
+    with open(path, "rb") as f:
+        state = pickle.loads(gzip.decompress(f.read()))
+    saved_config = state["config"]
+    if config is None:
+        config = saved_config
+    p = neat.Population(config, (state["population"], state["species"], state["generation"]))
+    p.reproduction.genome_indexer = itertools.count(state["next_genome_key"])
+    p.reproduction.ancestors = state["ancestors"]
+    p.best_genome = state["best_genome"]
+    random.setstate(state["random_state"]) # after Population, which may seed it
+    # innovation numbers must carry on from where they were
+    tracker = getattr(saved_config.genome_config, "innovation_tracker", None)
+    if tracker is not None:
+        p.reproduction.innovation_tracker = tracker
+        config.genome_config.innovation_tracker = tracker
+    return p, state["extra"]
@@ -0,0 +1,60 @@
+import struct
+
+# file header: magic, format version, seed, number of frames, scenario
+_HEADER = struct.Struct("<4sBqIi")
+_HEADER_V1 = struct.Struct("<4sBqI") # no scenario
+_MAGIC = b"FRTR"
+_VERSION = 2
+
+class DecisionTrace:
+    """The decisions taken by a frog, one per frame, packed 2 bits each
+    (0 FORWARD, 1 LEFT, 2 RIGHT, 3 REST). Together with the seed of the
+    world (and its scenario_bank index, -1 if none) it is enough to replay
+    the whole game (see replay.py).
+    """
+    __slots__ = ("seed", "frames", "data", "scenario")
+
+    def __init__(self, seed: int, frames: int = 0, data: bytes | bytearray = b"",
+                 scenario: int = -1):
+        self.seed = seed
+        self.frames = frames
+        self.data = bytearray(data)
+        self.scenario = scenario
+
+    def __len__(self) -> int:
+        return self.frames
+
+    def __getitem__(self, frame: int) -> int:
+        if not 0 <= frame < self.frames:
+            raise IndexError("frame out of trace")
+        return (self.data[frame >> 2] >> ((frame & 3) << 1)) & 3
+
+    def append(self, decision: int):
+        shift = (self.frames & 3) << 1
+        if shift == 0:
+            self.data.append(decision)
+        else:
+            self.data[-1] |= decision << shift
+        self.frames += 1
+
+    def to_bytes(self) -> bytes:
+        return (_HEADER.pack(_MAGIC, _VERSION, self.seed, self.frames, self.scenario)
+                + bytes(self.data))
+
+    @classmethod
+    def from_bytes(cls, raw: bytes) -> "DecisionTrace":
+        magic, version, seed, frames = _HEADER_V1.unpack_from(raw)
+        if magic != _MAGIC or version not in (1, _VERSION):
+            raise ValueError("Not a decision trace file")
+        header = _HEADER_V1 if version == 1 else _HEADER
+        scenario = -1 if version == 1 else header.unpack_from(raw)[-1]
+        data = raw[header.size:header.size + (frames + 3) // 4]
+        return cls(seed, frames, data, scenario)
+
+def save_trace(path: str, trace: DecisionTrace):
+    with open(path, "wb") as f:
+        f.write(trace.to_bytes())
+
+def load_trace(path: str) -> DecisionTrace:
+    with open(path, "rb") as f:
+        return DecisionTrace.from_bytes(f.read())
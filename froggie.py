@@ -1,7 +1,12 @@
 import pygame
-from game_config import FPS, SCREEN_WIDTH, SCREEN_HEIGHT
+import argparse
+from time import perf_counter
+from game_config import FPS, RENDER_FPS, SCREEN_WIDTH, SCREEN_HEIGHT
 from game_logics import LevelGenerator
 from sprites import Frog, Line, Texture, Obstacle
+from renderer import DirtyRenderer, Interpolator
+
+MAX_FRAME_TIME = 0.25 # seconds of game caught up at most per drawn frame
 
 def reorder_lines(lines: list[Line]):
     for i, line in enumerate(lines):
@@ -11,10 +16,15 @@ def hitbox_collision(sprite_a: pygame.sprite.Sprite | Frog,
                      sprite_b: pygame.sprite.Sprite | Obstacle):
     return sprite_a.hitbox.colliderect(sprite_b.rect)
 
-def main():
+def main(speed: float = 1.0):
+    """The game ticks FPS times per (game) second whatever the frame rate:
+    frames are drawn up to RENDER_FPS times per second, in between two ticks
+    when they fall there. `speed` > 1 runs faster than real time."""
     pygame.init()
     screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
     clock = pygame.time.Clock()
+    renderer = DirtyRenderer(screen)
+    interpolator = Interpolator()
     running = True
 
     # 1. Setup Frog
@@ -42,66 +52,147 @@ def main():
 
     gen = LevelGenerator(fivelines)
 
+    tick = 1 / FPS
+    lag = 0.0 # game time not simulated yet
+    keys = [] # pressed since the last tick
+    last_time = perf_counter()
+
     while running:
+        now = perf_counter()
+        lag += min(now - last_time, MAX_FRAME_TIME) * speed
+        last_time = now
+
         for event in pygame.event.get():
             if event.type == pygame.QUIT:
                 running = False
 
             if event.type == pygame.KEYDOWN:
-                if event.key == pygame.K_UP:
+                keys.append(event.key)
+
+        while lag >= tick:
+            interpolator.save(gen.lines, [frog])
+            for key in keys:
+                if key == pygame.K_UP:
                     if frog.can_move():
                         frog.jump() 
                         frog.face_north()
                         gen.spawn_new_line(all_sprites)
                         reorder_lines(gen.lines)
-                elif event.key == pygame.K_LEFT:
+                elif key == pygame.K_LEFT:
                     frog.move_horizontal(-1)
-                elif event.key == pygame.K_RIGHT:
+                elif key == pygame.K_RIGHT:
                     frog.move_horizontal(1)
-
-        # LOGIC UPDATE
-        all_sprites.update()
-
-        # --- LOGIC: Handle Platform Riding & Collisions ---
-        # Level 0 is the lane the frog is currently in
-        current_lane = gen.lines[0] 
-        
-        if abs(current_lane.rect.y - current_lane.target_y) < 5: 
-        # this ensures that collisions are checked after sliding
-            hits = pygame.sprite.spritecollide(frog, current_lane.obstacles, 
-                                               False, collided=hitbox_collision)
-            frog.hitbox.center = frog.rect.center
-            # Check collision with obstacles in the current lane
-            if current_lane.texture_type == Texture.WATER:
-                if hits:
-                    # The frog is on a log! Move it with the log's speed
-                    # (Assuming all logs in a lane move at the same speed)
-                    frog.stay_on_platform(current_lane.speed)
-                else:
-                    # Optional: Add a 'dead' flag here for NEAT to reset
-                    print("DROWNED!")
-            elif current_lane.texture_type == Texture.ASPHALT:
-                if hits:
-                    print("SMASHED!")
+            keys.clear()
+            update_world(gen, all_sprites, frog)
+            lag -= tick
 
         # RENDERING
-        screen.fill("black")
+        # Lanes are cached in the renderer, only moving sprites get redrawn.
+        # The frog is drawn last so it is on top of logs/cars
+        lanes, frogs = interpolator.views(gen.lines, [frog], lag / tick)
+        renderer.draw(lanes, frogs)
+
+        clock.tick(RENDER_FPS)
+
+    pygame.quit()
 
-        # To draw obstacles correctly, we draw in layers
-        for line in gen.lines:
-            # Draw the lane background
-            screen.blit(line.image, line.rect)
-            # Draw the obstacles belonging to this specific lane
-            line.obstacles.draw(screen)
+def update_world(gen: LevelGenerator, all_sprites: pygame.sprite.Group, frog: Frog):
+    """One logic tick."""
+    all_sprites.update()
 
-        # Draw the frog last so it is on top of logs/cars
-        frog.draw(screen)
-        frog.update()
+    # --- LOGIC: Handle Platform Riding & Collisions ---
+    # Level 0 is the lane the frog is currently in
+    current_lane = gen.lines[0] 
+    
+    if abs(current_lane.rect.y - current_lane.target_y) < 5: 
+    # this ensures that collisions are checked after sliding
+        hits = pygame.sprite.spritecollide(frog, current_lane.obstacles, 
+                                           False, collided=hitbox_collision)
+        frog.hitbox.center = frog.rect.center
+        # Check collision with obstacles in the current lane
+        if current_lane.texture_type == Texture.WATER:
+            if hits:
+                # The frog is on a log! Move it with the log's speed
+                # (Assuming all logs in a lane move at the same speed)
+                frog.stay_on_platform(current_lane.speed)
+            else:
+                # Optional: Add a 'dead' flag here for NEAT to reset
+                print("DROWNED!")
+        elif current_lane.texture_type == Texture.ASPHALT:
+            if hits:
+                print("SMASHED!")
+
+    frog.update()
+
+def replay(trace_file: str, speed: float = 1.0, start_frame: int = 0,
+           scenario_bank_file: str | None = None):
+    """Plays back a game recorded during the evolution.
+    Controls: SPACE pause, LEFT/RIGHT seek -/+ 1 second, UP/DOWN double/halve speed.
+    """
+    # imported here so the plain game does not need neat
+    from decision_trace import load_trace
+    from replay import Replay
+    from scenario_bank import ScenarioBank
+
+    bank = None if scenario_bank_file is None else ScenarioBank(scenario_bank_file)
+    game = Replay(load_trace(trace_file), bank)
+    game.seek(start_frame)
 
-        pygame.display.update()
+    pygame.init()
+    screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
+    clock = pygame.time.Clock()
+    renderer = DirtyRenderer(screen)
+    running = True
+    paused = False
+    pending_steps = 0.0
+
+    while running:
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT:
+                running = False
+            if event.type == pygame.KEYDOWN:
+                if event.key == pygame.K_SPACE:
+                    paused = not paused
+                elif event.key == pygame.K_LEFT:
+                    game.seek(game.frame - FPS)
+                elif event.key == pygame.K_RIGHT:
+                    game.seek(game.frame + FPS)
+                elif event.key == pygame.K_UP:
+                    speed *= 2
+                elif event.key == pygame.K_DOWN:
+                    speed /= 2
+
+        # speed is in game frames per displayed frame, fractions accumulate
+        if not paused:
+            pending_steps += speed
+            while pending_steps >= 1:
+                game.step()
+                pending_steps -= 1
+
+        renderer.draw(game.sim.lines, [game.sim.frog])
+        pygame.display.set_caption(
+            f"Replay seed {game.trace.seed}"
+            f" | Frame: {game.frame}/{game.total_frames}"
+            f" | Fitness: {game.sim.genome.fitness:.2f}"
+            f" | Speed: x{speed:g}{' (paused)' if paused else ''}"
+        )
         clock.tick(FPS)
 
     pygame.quit()
 
 if __name__=='__main__':
-    main()
+    parser = argparse.ArgumentParser(description="Froggy Road")
+    parser.add_argument("--replay", metavar="TRACE_FILE",
+                        help="play back a recorded game instead of playing")
+    parser.add_argument("--speed", type=float, default=1.0,
+                        help="game (or replay) speed multiplier")
+    parser.add_argument("--seek", type=int, default=0,
+                        help="replay starting frame")
+    parser.add_argument("--scenario-bank", metavar="FILE", default=None,
+                        help="scenario bank the replayed game was played on")
+    args = parser.parse_args()
+    if args.replay:
+        replay(args.replay, speed=args.speed, start_frame=args.seek,
+               scenario_bank_file=args.scenario_bank)
+    else:
+        main(speed=args.speed)
@@ -1,3 +1,5 @@
 SCREEN_WIDTH = 600
 SCREEN_HEIGHT = 400
-FPS = 80
\ No newline at end of file
+FPS = 80 # logic ticks per second: the game speed
+RENDER_FPS = 120 # cap of the frames drawn by froggie.py, 0 uncapped
+SPECTATOR_FPS = 30
\ No newline at end of file
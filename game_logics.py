@@ -4,53 +4,70 @@ import math
 import random
 from sprites import Line, Texture
 
+def next_texture(last_texture: Texture, steps_taken: int, rng) -> Texture:
+    """Markovian choice of the next lane texture given the last one."""
+    # 1. Calculate Probability of Grass
+    # Using 1/log2(progress + 2) to avoid log(1) or log(0)
+    p_grass = max(1.3 / math.log2(steps_taken + 2), 1/8)
+    if last_texture == Texture.GRASS:
+        p_grass = 0
+        
+    # 2. Determine remaining probability for Asphalt vs Water
+    p_remaining = 1.0 - p_grass
+    
+    if last_texture == Texture.GRASS:
+        # ASPHALT|GRASS = RIVER|GRASS = (1-GRASS|GRASS)/2
+        p_asphalt = p_remaining / 2
+    elif last_texture == Texture.ASPHALT:
+        # ASPHALT|ASPHALT is 5x more likely than WATER|ASPHALT
+        p_asphalt = (p_remaining / 6) * 5
+        p_water = p_remaining / 6
+    elif last_texture == Texture.WATER:
+        # WATER|WATER is 3x more likely than ASPHALT|WATER
+        p_water = (p_remaining / 4) * 3
+        p_asphalt = p_remaining / 4
+        
+    # 3. Weighted Random Selection
+    choice = rng.random()
+    if choice < p_grass:
+        return Texture.GRASS
+    elif choice < (p_grass + p_asphalt):
+        return Texture.ASPHALT
+    else:
+        return Texture.WATER
+
 class LevelGenerator:
-    def __init__(self, initial_lines: list[Line], rng=None):
+    def __init__(self, initial_lines: list[Line], rng=None, scenario=None,
+                 line_type=Line):
         self.lines = initial_lines
         self.steps_taken = 0
         self.rng = random if rng is None else rng
+        self.scenario = scenario # a scenario_bank.Scenario replacing the rng draws
+        self.line_type = line_type # Line, or lane_model.LaneModel without sprites
+
+    def reset(self, scenario=None):
+        """Starts over on the same lines and rng (both reset by the caller)."""
+        self.steps_taken = 0
+        self.scenario = scenario
 
     def get_next_texture(self) -> Texture:
         self.steps_taken += 1
+        if self.scenario is not None and self.scenario.has_lane(self.steps_taken + 4):
+            # pre-generated world, the 5 initial lines are lanes 0-4
+            return self.scenario.texture(self.steps_taken + 4)
         last_texture = self.lines[-1].texture_type # We'll add this attribute to Line
-        
-        # 1. Calculate Probability of Grass
-        # Using 1/log2(progress + 2) to avoid log(1) or log(0)
-        p_grass = max(1.3 / math.log2(self.steps_taken + 2), 1/8)
-        if last_texture == Texture.GRASS:
-            p_grass = 0
-            
-        # 2. Determine remaining probability for Asphalt vs Water
-        p_remaining = 1.0 - p_grass
-        
-        if last_texture == Texture.GRASS:
-            # ASPHALT|GRASS = RIVER|GRASS = (1-GRASS|GRASS)/2
-            p_asphalt = p_remaining / 2
-        elif last_texture == Texture.ASPHALT:
-            # ASPHALT|ASPHALT is 5x more likely than WATER|ASPHALT
-            p_asphalt = (p_remaining / 6) * 5
-            p_water = p_remaining / 6
-        elif last_texture == Texture.WATER:
-            # WATER|WATER is 3x more likely than ASPHALT|WATER
-            p_water = (p_remaining / 4) * 3
-            p_asphalt = p_remaining / 4
-            
-        # 3. Weighted Random Selection
-        choice = self.rng.random()
-        if choice < p_grass:
-            return Texture.GRASS
-        elif choice < (p_grass + p_asphalt):
-            return Texture.ASPHALT
-        else:
-            return Texture.WATER
+        return next_texture(last_texture, self.steps_taken, self.rng)
 
-    def spawn_new_line(self, all_sprites: pygame.sprite.Group):
+    def spawn_new_line(self, all_sprites: pygame.sprite.Group | None = None):
         # Remove oldest
         old_line = self.lines.pop(0)
-        all_sprites.remove(old_line)
+        if all_sprites is not None:
+            all_sprites.remove(old_line)
         
         # Create newest
         next_tex = self.get_next_texture()
-        new_line = Line(next_tex, self.steps_taken, rng=self.rng)
+        plan = None if self.scenario is None else self.scenario.lane(self.steps_taken + 4)
+        new_line = self.line_type(next_tex, self.steps_taken, rng=self.rng, plan=plan)
         self.lines.append(new_line)
-        all_sprites.add(new_line)
\ No newline at end of file
+        if all_sprites is not None:
+            all_sprites.add(new_line)
\ No newline at end of file
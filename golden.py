@@ -0,0 +1,186 @@
+"""Golden traces: frame-by-frame references recorded with the sprite-based
+SingleSimulation, to check that an alternate engine plays exactly the same.
+
+    python golden.py record golden.npz --seeds 1 2 3 --genomes 8
+    python golden.py check golden.npz --engine lane-model
+
+An engine is any class built as `engine(genome, config, seed)` exposing the
+SingleSimulation interface (update, alive, frog, lines, trace, genome);
+register new ones in ENGINES.
+"""
+import os
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+import neat
+import numpy as np
+
+import argparse
+import copy
+import json
+import pickle
+from time import perf_counter
+import simulation
+
+ENGINES = {
+    "sprites": simulation.SingleSimulation, # the reference
+    "lane-model": simulation.LaneModelSimulation,
+}
+
+# One row per frame; obstacles are stored flat, `n_obstacles` per frame
+FRAME_FIELDS = ["frog", "textures", "lane_y", "decision", "fitness_delta", "n_obstacles"]
+
+def capture(engine, genome, config, seed: int, max_frames: int) -> tuple[dict, float]:
+    """Plays one game and returns its per-frame state and the seconds spent in update()."""
+    genome = copy.deepcopy(genome)
+    genome.fitness = 0
+    sim = engine(genome, config, seed=seed)
+    rows = {name: [] for name in FRAME_FIELDS}
+    obstacles = []
+    elapsed = 0.0
+    fitness = 0
+    while sim.alive and sim.trace.frames < max_frames:
+        start = perf_counter()
+        sim.update()
+        elapsed += perf_counter() - start
+        rows["frog"].append(sim.frog.rect.topleft)
+        rows["textures"].append([line.texture_type.value for line in sim.lines])
+        rows["lane_y"].append([line.y for line in sim.lines])
+        rows["decision"].append(sim.trace[sim.trace.frames - 1])
+        rows["fitness_delta"].append(sim.genome.fitness - fitness)
+        fitness = sim.genome.fitness
+        spans = [span for line in sim.lines for span in line.obstacle_spans()]
+        rows["n_obstacles"].append(len(spans))
+        obstacles.extend(spans)
+    frames = {
+        "frog": np.array(rows["frog"], dtype=np.int16).reshape(-1, 2),
+        "textures": np.array(rows["textures"], dtype=np.uint8).reshape(-1, 5),
+        "lane_y": np.array(rows["lane_y"], dtype=np.int16).reshape(-1, 5),
+        "decision": np.array(rows["decision"], dtype=np.uint8),
+        "fitness_delta": np.array(rows["fitness_delta"], dtype=np.float64),
+        "n_obstacles": np.array(rows["n_obstacles"], dtype=np.uint8),
+        "obstacles": np.array(obstacles, dtype=np.int16).reshape(-1, 2), # (left, right)
+    }
+    return frames, elapsed
+
+def make_genomes(config: neat.Config, n: int, seed: int, evolve: int) -> list:
+    """The `n` fittest genomes of a seeded population evolved headless for
+    `evolve` generations, so that some of them survive long enough to be
+    interesting."""
+    simulation.headless = True
+    evaluated = {}
+    def evaluate(genomes, config):
+        simulation.eval_genomes(genomes, config)
+        evaluated.clear()
+        evaluated.update(genomes)
+    p = neat.Population(config, seed=seed)
+    p.run(evaluate, max(evolve, 1))
+    simulation.generation = 0
+    ranked = sorted(evaluated.values(), key=lambda g: g.fitness, reverse=True)
+    return ranked[:n]
+
+def record(path: str, config: neat.Config, seeds: list[int], n_genomes: int,
+           genome_seed: int = 0, evolve: int = 3, max_frames: int = 5000):
+    genomes = make_genomes(config, n_genomes, genome_seed, evolve)
+    arrays = {}
+    cases = []
+    for g, genome in enumerate(genomes):
+        for seed in seeds:
+            frames, elapsed = capture(ENGINES["sprites"], genome, config, seed, max_frames)
+            i = len(cases)
+            cases.append({"genome": g, "seed": seed, "frames": len(frames["decision"]),
+                          "update_seconds": elapsed})
+            arrays.update({f"{i}/{name}": a for name, a in frames.items()})
+    meta = {"max_frames": max_frames, "cases": cases}
+    arrays["meta"] = np.frombuffer(json.dumps(meta).encode(), dtype=np.uint8)
+    arrays["genomes"] = np.frombuffer(pickle.dumps(genomes), dtype=np.uint8)
+    np.savez_compressed(path, **arrays)
+    total = sum(c["frames"] for c in cases)
+    print(f"{len(cases)} games, {total} frames recorded to {path}")
+
+def first_divergence(expected: dict, got: dict) -> tuple[int, list[str]] | None:
+    """(frame, fields that differ there), None if the games are identical."""
+    n = min(len(expected["decision"]), len(got["decision"]))
+    first = n
+    for name in FRAME_FIELDS:
+        a, b = expected[name][:n], got[name][:n]
+        differs = (a != b) if a.ndim == 1 else (a != b).any(axis=1)
+        if differs.any():
+            first = min(first, int(differs.argmax()))
+    # obstacles: compare frame by frame up to the first frame already found
+    ends_a = np.cumsum(expected["n_obstacles"][:first].astype(np.int64))
+    ends_b = np.cumsum(got["n_obstacles"][:first].astype(np.int64))
+    if first and ends_a[-1] == ends_b[-1]:
+        differs = (expected["obstacles"][:ends_a[-1]] != got["obstacles"][:ends_b[-1]]).any(axis=1)
+        if differs.any():
+            first = int(np.searchsorted(ends_a, differs.argmax(), side="right"))
+    if first == n:
+        if len(expected["decision"]) == len(got["decision"]):
+            return None
+        return n, ["length"]
+    fields = [name for name in FRAME_FIELDS if not np.array_equal(expected[name][first], got[name][first])]
+    start_a = int(ends_a[first - 1]) if first else 0
+    start_b = int(ends_b[first - 1]) if first else 0
+    count = int(expected["n_obstacles"][first])
+    if not np.array_equal(expected["obstacles"][start_a:start_a + count],
+                          got["obstacles"][start_b:start_b + int(got["n_obstacles"][first])]):
+        fields.append("obstacles")
+    return first, fields
+
+def check(path: str, config: neat.Config, engine_name: str) -> bool:
+    """Replays every recorded game with the engine, prints the first divergence
+    of each and the speed relative to the reference. True if all match."""
+    engine = ENGINES[engine_name]
+    data = np.load(path)
+    meta = json.loads(data["meta"].tobytes())
+    genomes = pickle.loads(data["genomes"].tobytes())
+    reference_seconds = engine_seconds = 0.0
+    mismatches = 0
+    for i, case in enumerate(meta["cases"]):
+        expected = {name: data[f"{i}/{name}"] for name in FRAME_FIELDS + ["obstacles"]}
+        got, elapsed = capture(engine, genomes[case["genome"]], config, case["seed"],
+                               meta["max_frames"])
+        reference_seconds += case["update_seconds"]
+        engine_seconds += elapsed
+        divergence = first_divergence(expected, got)
+        if divergence is not None:
+            mismatches += 1
+            frame, fields = divergence
+            print(f"game {i} (genome {case['genome']}, seed {case['seed']}):"
+                  f" diverges at frame {frame} in {', '.join(fields)}")
+            for name in fields:
+                if name in FRAME_FIELDS:
+                    print(f"    {name}: expected {expected[name][frame].tolist()}"
+                          f" got {got[name][frame].tolist()}")
+    frames = sum(c["frames"] for c in meta["cases"])
+    print(f"{engine_name}: {len(meta['cases']) - mismatches}/{len(meta['cases'])} games identical,"
+          f" {frames} frames, {engine_seconds:.2f} s in update"
+          f" ({reference_seconds / max(engine_seconds, 1e-9):.2f}x the recorded reference)")
+    return mismatches == 0
+
+def load_config(config_file: str) -> neat.Config:
+    return neat.Config(neat.DefaultGenome, neat.DefaultReproduction,
+                       neat.DefaultSpeciesSet, neat.DefaultStagnation, config_file)
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Record golden traces or check an engine against them")
+    commands = parser.add_subparsers(dest="command", required=True)
+    rec = commands.add_parser("record")
+    rec.add_argument("path")
+    rec.add_argument("--seeds", type=int, nargs="+", default=[1, 2, 3])
+    rec.add_argument("--genomes", type=int, default=8)
+    rec.add_argument("--genome-seed", type=int, default=0)
+    rec.add_argument("--evolve", type=int, default=3,
+                     help="generations evolved before picking the genomes")
+    rec.add_argument("--max-frames", type=int, default=5000)
+    chk = commands.add_parser("check")
+    chk.add_argument("path")
+    chk.add_argument("--engine", choices=list(ENGINES), default="lane-model")
+    parser.add_argument("--config", default="neat-config.txt")
+    args = parser.parse_args()
+
+    config = load_config(args.config)
+    if args.command == "record":
+        record(args.path, config, args.seeds, args.genomes, args.genome_seed,
+               args.evolve, args.max_frames)
+    elif not check(args.path, config, args.engine):
+        raise SystemExit(1)
@@ -0,0 +1,182 @@
+import pygame
+from game_config import SCREEN_WIDTH, SCREEN_HEIGHT
+from sprites import CAR_SPEEDS, LOG_SPEEDS, Texture, get_image, spawn_rate_for
+
+import random
+
+LANE_HEIGHT = int(SCREEN_HEIGHT / 5)
+CAR_SIZE = (64, 48) # size of the CAR sprite
+LOG_WIDTHS = [72, 108] # SHORTLOG, LONGLOG, same order as Obstacle picks them
+LOG_HEIGHT = 36
+CAPACITY = 16 # initial ring buffer size, lanes hold at most ~8 obstacles
+
+def pygame_round(value: float) -> int:
+    """Rounds half away from zero, like pygame.Rect does with floats."""
+    whole = int(value)
+    if abs(value - whole) >= 0.5:
+        return whole + (1 if value > 0 else -1)
+    return whole
+
+class LaneModel:
+    """Simulation-only version of sprites.Line.
+
+    Same rules and same rng draws, so a world built from LaneModels plays
+    exactly like one built from Lines, but obstacles are just (left, width)
+    pairs in a ring buffer: every obstacle of a lane moves at the same speed
+    from the same edge, so they always leave in the order they came.
+    No Surface or Sprite is created unless the lane gets drawn (see `image`,
+    `rect` and `obstacles`).
+    """
+    __slots__ = ("texture_type", "safe_ground", "speed", "spawn_rate", "spawn_timer",
+                 "y", "target_y", "rng", "plan", "obstacle_height",
+                 "_left", "_width", "_head", "_count")
+
+    def __init__(self, texture: Texture = Texture.GRASS,
+                 progress: int = 0, rng=None, plan=None):
+        self._left = [0] * CAPACITY
+        self._width = [0] * CAPACITY
+        self.reset(texture, progress, rng, plan)
+
+    def reset(self, texture: Texture = Texture.GRASS,
+              progress: int = 0, rng=None, plan=None):
+        """Turns this lane into a new one, keeping its obstacle buffer."""
+        self.texture_type = texture
+        self.safe_ground = texture != Texture.WATER
+        self.y = 0
+        self.target_y = 0
+        self.rng = random if rng is None else rng
+        self.plan = plan # a scenario_bank.LanePlan
+
+        if texture == Texture.ASPHALT:
+            self.speed = self.rng.choice(CAR_SPEEDS) if plan is None else plan.speed
+            self.obstacle_height = CAR_SIZE[1]
+        elif texture == Texture.WATER:
+            self.speed = self.rng.choice(LOG_SPEEDS) if plan is None else plan.speed
+            self.obstacle_height = LOG_HEIGHT
+        else:
+            self.speed = 0
+            self.obstacle_height = 0
+        self.spawn_rate = spawn_rate_for(texture, progress)
+        self.spawn_timer = 0
+        self._head = 0
+        self._count = 0
+
+    def goto_level(self, level: int):
+        """"0th level: go to the bottom, 4th level: go to the top"""
+        if level < 0 or level > 4:
+            raise ValueError("Game is designed for 5 levels")
+        self.target_y = SCREEN_HEIGHT - (level + 1) * (SCREEN_HEIGHT / 5)
+
+    def _spawn_single_obstacle(self):
+        if self.texture_type == Texture.ASPHALT:
+            width = CAR_SIZE[0]
+        else:
+            width = (self.rng if self.plan is None else self.plan).choice(LOG_WIDTHS)
+        x_start = -100 if self.speed > 0 else SCREEN_WIDTH + 100
+        capacity = len(self._left)
+        if self._count == capacity:
+            # unroll and double the buffer
+            order = [(self._head + k) % capacity for k in range(capacity)]
+            self._left = [self._left[i] for i in order] + [0] * capacity
+            self._width = [self._width[i] for i in order] + [0] * capacity
+            self._head = 0
+            capacity *= 2
+        tail = (self._head + self._count) % capacity
+        self._left[tail] = x_start - width // 2
+        self._width[tail] = width
+        self._count += 1
+
+    def update(self):
+        """Slide, spawn and move obstacles, as Line.update does."""
+        distance = self.target_y - self.y
+        if abs(distance) > 1:
+            self.y = pygame_round(self.y + distance * 0.2)
+        else:
+            self.y = pygame_round(self.target_y)
+
+        if self.spawn_rate > 0:
+            self.spawn_timer -= 1
+            if self.spawn_timer <= 0:
+                self._spawn_single_obstacle()
+                if self.plan is None:
+                    self.spawn_timer = self.spawn_rate + self.rng.randint(-5, 20)
+                else:
+                    self.spawn_timer = self.spawn_rate + self.plan.next_jitter()
+
+        if self._count:
+            left = self._left
+            speed = self.speed
+            capacity = len(left)
+            for k in range(self._count):
+                i = (self._head + k) % capacity
+                # rect.x += speed, rounded by pygame
+                left[i] = left[i] + speed if type(speed) is int else pygame_round(left[i] + speed)
+            # drop the obstacles that left the screen, oldest first
+            while self._count:
+                i = self._head
+                if ((speed > 0 and left[i] > SCREEN_WIDTH)
+                        or (speed < 0 and left[i] + self._width[i] < 0)):
+                    self._head = (i + 1) % capacity
+                    self._count -= 1
+                else:
+                    break
+
+    def obstacle_spans(self) -> list[tuple[int, int]]:
+        """(left, right) of every obstacle, oldest first."""
+        capacity = len(self._left)
+        spans = []
+        for k in range(self._count):
+            i = (self._head + k) % capacity
+            spans.append((self._left[i], self._left[i] + self._width[i]))
+        return spans
+
+    def collides(self, hitbox: pygame.Rect) -> bool:
+        # obstacles are kept centered on the lane like Obstacle.update does
+        top = self.y + SCREEN_HEIGHT // 10 - self.obstacle_height // 2
+        if not (hitbox.top < top + self.obstacle_height and hitbox.bottom > top):
+            return False
+        for left, right in self.obstacle_spans():
+            if hitbox.left < right and hitbox.right > left:
+                return True
+        return False
+
+    # --- Rendering only, built on demand ---
+    @property
+    def image(self) -> pygame.Surface:
+        return lane_image(self.texture_type)
+
+    @property
+    def rect(self) -> pygame.Rect:
+        return pygame.Rect(0, self.y, SCREEN_WIDTH, LANE_HEIGHT)
+
+    @property
+    def obstacles(self) -> list[pygame.sprite.Sprite]:
+        top = self.y + SCREEN_HEIGHT // 10 - self.obstacle_height // 2
+        is_car = self.texture_type == Texture.ASPHALT
+        sprites = []
+        for left, right in self.obstacle_spans():
+            sprite = pygame.sprite.Sprite()
+            sprite.is_car = is_car
+            sprite.speed = self.speed
+            sprite.image = obstacle_image(is_car, self.speed, right - left)
+            sprite.rect = sprite.image.get_rect(topleft=(left, top))
+            sprites.append(sprite)
+        return sprites
+
+_lane_images: dict[Texture, pygame.Surface] = {}
+_obstacle_images: dict[tuple, pygame.Surface] = {}
+
+def lane_image(texture: Texture) -> pygame.Surface:
+    """One shared surface per texture."""
+    if texture not in _lane_images:
+        _lane_images[texture] = get_image(f"{texture.name}_TEXTURE")
+    return _lane_images[texture]
+
+def obstacle_image(is_car: bool, speed: float, width: int) -> pygame.Surface:
+    key = (is_car, speed < 0, width)
+    if key not in _obstacle_images:
+        if is_car:
+            _obstacle_images[key] = get_image("CAR_LEFT" if speed < 0 else "CAR")
+        else:
+            _obstacle_images[key] = get_image("SHORTLOG" if width == LOG_WIDTHS[0] else "LONGLOG")
+    return _obstacle_images[key]
@@ -0,0 +1,144 @@
+import numpy as np
+
+import heapq
+from time import perf_counter
+from game_config import SCREEN_WIDTH
+
+X_BINS = 8 # horizontal position histogram
+DISTANCE_SCALE = 10.0 # lanes crossed per unit of descriptor distance
+DESCRIPTOR_SIZE = 1 + X_BINS + 4
+
+def x_bin(x: float) -> int:
+    return min(X_BINS - 1, max(0, int(x * X_BINS / SCREEN_WIDTH)))
+
+def action_frequencies(trace) -> np.ndarray:
+    """Fraction of the frames spent on each decision (FORWARD, LEFT, RIGHT, REST)."""
+    packed = np.frombuffer(bytes(trace.data), dtype=np.uint8)
+    decisions = (packed[:, None] >> np.array([0, 2, 4, 6], dtype=np.uint8)) & 3
+    counts = np.bincount(decisions.ravel()[:trace.frames], minlength=4)
+    return counts / max(trace.frames, 1)
+
+def behaviour_descriptor(sim) -> np.ndarray:
+    """What a finished game looked like: lanes crossed, where the frog
+    stood (sim.x_visits, fraction of frames per horizontal bin) and how
+    often it took each decision."""
+    descriptor = np.empty(DESCRIPTOR_SIZE)
+    descriptor[0] = sim.distance_score / DISTANCE_SCALE
+    visits = np.asarray(sim.x_visits, dtype=np.float64)
+    descriptor[1:1 + X_BINS] = visits / max(visits.sum(), 1)
+    descriptor[1 + X_BINS:] = action_frequencies(sim.trace)
+    return descriptor
+
+class _Node:
+    __slots__ = ("dim", "split", "left", "right", "items")
+
+    def __init__(self, items: list[int]):
+        self.dim = self.split = self.left = self.right = None
+        self.items = items # point indices, None once split
+
+class KDTree:
+    """k-d tree with incremental insertion. Points are kept in leaf buckets
+    of up to 2 * `leaf_size` points (compared with numpy in one go); a full
+    bucket is split at the median of its widest dimension, so the tree stays
+    balanced for the data actually inserted without ever being rebuilt."""
+    def __init__(self, dims: int, leaf_size: int = 16):
+        self.dims = dims
+        self.leaf_size = leaf_size
+        self.points = np.empty((64, dims))
+        self.size = 0
+        self.root = _Node([])
+
+    def __len__(self) -> int:
+        return self.size
+
+    def insert(self, point: np.ndarray) -> int:
+        if self.size == len(self.points):
+            self.points = np.concatenate([self.points, np.empty_like(self.points)])
+        i = self.size
+        self.points[i] = point
+        self.size += 1
+        node = self.root
+        while node.items is None:
+            node = node.left if point[node.dim] < node.split else node.right
+        node.items.append(i)
+        if len(node.items) > 2 * self.leaf_size:
+            self._split(node)
+        return i
+
+    def _split(self, node: _Node):
+        items = np.array(node.items)
+        points = self.points[items]
+        dim = int(np.argmax(points.max(axis=0) - points.min(axis=0)))
+        split = float(np.median(points[:, dim]))
+        goes_left = points[:, dim] < split
+        if goes_left.all() or not goes_left.any():
+            return # all equal along the widest dimension: keep the bucket
+        node.dim, node.split = dim, split
+        node.left = _Node(items[goes_left].tolist())
+        node.right = _Node(items[~goes_left].tolist())
+        node.items = None
+
+    def nearest(self, point: np.ndarray, k: int, exclude: int = -1) -> list[tuple[float, int]]:
+        """The k nearest points as (squared distance, index), closest first.
+        `exclude` is an index to leave out (the point itself)."""
+        best = [] # max-heap of (-squared distance, index)
+        stack = [(0.0, self.root)]
+        while stack:
+            bound, node = stack.pop()
+            if len(best) == k and bound >= -best[0][0]:
+                continue
+            if node.items is not None:
+                if not node.items:
+                    continue
+                items = np.array(node.items)
+                d = ((self.points[items] - point) ** 2).sum(axis=1)
+                for dist, i in zip(d.tolist(), node.items):
+                    if i == exclude:
+                        continue
+                    if len(best) < k:
+                        heapq.heappush(best, (-dist, i))
+                    elif dist < -best[0][0]:
+                        heapq.heapreplace(best, (-dist, i))
+                continue
+            diff = point[node.dim] - node.split
+            near, far = (node.left, node.right) if diff < 0 else (node.right, node.left)
+            # far side first on the stack, so the near side is searched first
+            stack.append((max(bound, diff * diff), far))
+            stack.append((bound, near))
+        return sorted((-d, i) for d, i in best)
+
+class NoveltyArchive:
+    """Behaviours worth remembering, kept in a KDTree.
+
+    The novelty of a genome is the mean distance from its descriptor to the
+    `k` nearest behaviours among the archive and the rest of its own
+    generation. After each generation the `add_per_generation` most novel
+    behaviours join the archive.
+    """
+    def __init__(self, k: int = 15, add_per_generation: int = 5):
+        self.k = k
+        self.add_per_generation = add_per_generation
+        self.tree = KDTree(DESCRIPTOR_SIZE)
+        self.last_seconds = 0.0 # spent in the last score()
+
+    def __len__(self) -> int:
+        return len(self.tree)
+
+    def score(self, descriptors: dict[int, np.ndarray]) -> dict[int, float]:
+        """Novelty of each genome key of a generation, then archives the most novel."""
+        start = perf_counter()
+        keys = list(descriptors)
+        population = KDTree(DESCRIPTOR_SIZE)
+        for key in keys:
+            population.insert(descriptors[key])
+        scores = {}
+        for i, key in enumerate(keys):
+            point = descriptors[key]
+            neighbours = heapq.nsmallest(
+                self.k,
+                population.nearest(point, self.k, exclude=i) + self.tree.nearest(point, self.k))
+            scores[key] = float(np.mean([d ** 0.5 for d, _ in neighbours])) if neighbours else 0.0
+        for key in heapq.nlargest(self.add_per_generation, keys, key=scores.get):
+            self.tree.insert(descriptors[key])
+        self.last_seconds = perf_counter() - start
+        return scores
@@ -0,0 +1,210 @@
+import neat
+import numpy as np
+
+import concurrent.futures
+import multiprocessing
+import os
+from multiprocessing import shared_memory
+from time import perf_counter
+from decision_trace import DecisionTrace
+from genome_codec import decode_arrays, encode_genome, network_from_arrays
+
+# One row per genome slot, written by the worker that played it
+RESULT_DTYPE = np.dtype([
+    ("fitness", "<f8"),
+    ("frames", "<u4"), # frames survived
+    ("distance", "<u4"), # lanes crossed
+    ("trace_frames", "<u4"), # decisions kept in the trace buffer
+    ("skipped", "<u4"), # frames not simulated, see SingleSimulation.retire_resting
+])
+MAX_TRACE_FRAMES = 1 << 16 # per genome, longer games keep only their start (0: no traces)
+
+class SharedArray:
+    """A NumPy array living in a multiprocessing.shared_memory block.
+    Pickling sends only the block's name; the other side attaches to it."""
+    def __init__(self, shape: tuple, dtype: np.dtype, name: str | None = None):
+        self.shape = shape
+        self.dtype = np.dtype(dtype)
+        size = max(1, int(np.prod(shape)) * self.dtype.itemsize)
+        if name is None:
+            self.shm = shared_memory.SharedMemory(create=True, size=size)
+        else:
+            # attached: unlinking is left to the creator
+            self.shm = shared_memory.SharedMemory(name=name, track=False)
+        self.array = np.ndarray(shape, dtype=self.dtype, buffer=self.shm.buf)
+
+    def __reduce__(self):
+        return (SharedArray, (self.shape, self.dtype, self.shm.name))
+
+    def close(self, unlink: bool = False):
+        self.array = None
+        self.shm.close()
+        if unlink:
+            self.shm.unlink()
+
+# Worker state, set by _init_worker
+_config = None
+_scenario_bank = None
+_attached: dict[str, SharedArray] = {} # block name -> array, kept while in use
+
+def _init_worker(config_file: str, lane_model: bool, scenario_bank, prune: bool):
+    global _config, _scenario_bank
+    os.environ["SDL_VIDEODRIVER"] = "dummy"
+    os.environ["PYGAME_HIDE_SUPPORT_PROMPT"] = "1"
+    import simulation
+    simulation.headless = True
+    simulation.prune_hopeless = prune
+    simulation.simulation_type = (simulation.LaneModelSimulation if lane_model
+                                  else simulation.SingleSimulation)
+    _config = neat.Config(neat.DefaultGenome, neat.DefaultReproduction,
+                          neat.DefaultSpeciesSet, neat.DefaultStagnation, config_file)
+    _scenario_bank = scenario_bank
+
+def _attach(*blocks: SharedArray) -> list[np.ndarray]:
+    """Arrays of `blocks`, attached once per worker. Blocks of earlier
+    tasks that are not among them any more (the parent reallocated them)
+    are closed, so their memory can go away."""
+    names = {shared.shm.name for shared in blocks}
+    for name in [name for name in _attached if name not in names]:
+        _attached.pop(name).close()
+    arrays = []
+    for shared in blocks:
+        name = shared.shm.name
+        if name not in _attached:
+            _attached[name] = shared
+        else:
+            shared.close() # already attached by an earlier task
+        arrays.append(_attached[name].array)
+    return arrays
+
+class _Player:
+    """What a simulation needs of a genome whose network is built already."""
+    __slots__ = ("key", "fitness", "trace")
+
+    def __init__(self, key: int):
+        self.key = key
+        self.fitness = 0
+
+def _evaluate_chunk(results: SharedArray, traces: SharedArray, seed: int,
+                    scenario_index: int | None, tasks: list[tuple[int, bytes]]):
+    """Plays the games of `tasks` (slot, encoded genome) and writes the
+    results into the slots of the shared blocks. Returns nothing."""
+    import simulation
+    results, traces = _attach(results, traces)
+    scenario = None if scenario_index is None else _scenario_bank[scenario_index]
+    sim = None
+    for slot, raw in tasks:
+        # the network comes straight from the encoded arrays, no gene objects
+        arrays = decode_arrays(raw)
+        net = network_from_arrays(arrays, _config)
+        genome = _Player(arrays.key)
+        if sim is None:
+            sim = simulation.simulation_type(genome, _config, seed=seed, scenario=scenario, net=net)
+        else:
+            sim.reset(genome, _config, seed=seed, scenario=scenario, net=net)
+        while sim.alive:
+            sim.update()
+        data = np.frombuffer(sim.trace.data, dtype=np.uint8)[:traces.shape[1]]
+        traces[slot, :len(data)] = data
+        results[slot] = (genome.fitness, sim.frames_survived, sim.distance_score,
+                         min(sim.trace.frames, traces.shape[1] * 4), sim.frames_skipped)
+
+class ParallelEvaluator:
+    """Fitness function for Population.run that plays the games headless in
+    `workers` processes.
+
+    Genomes are sent encoded (genome_codec) and workers build their networks
+    straight from the arrays (network_from_arrays). Results come back through
+    shared memory, never through a pipe. Each worker writes the fitness,
+    frames and distance of a genome into that genome's row of a
+    RESULT_DTYPE block, and its decision trace into the genome's row of a
+    trace block. The parent reads the fitness vector as a view. The blocks
+    grow if the population ever outgrows them.
+    """
+    def __init__(self, config_file: str, workers: int | None = None, lane_model: bool = False,
+                 scenario_bank=None, max_trace_frames: int = MAX_TRACE_FRAMES,
+                 prune: bool = False):
+        self.scenario_bank = scenario_bank
+        self.prune = prune
+        self.trace_bytes = max_trace_frames // 4
+        self.results = None
+        self.traces = None
+        self.last_seconds = 0.0
+        self.workers = workers or os.cpu_count()
+        self._executor = concurrent.futures.ProcessPoolExecutor(
+            max_workers=self.workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_worker, initargs=(config_file, lane_model, scenario_bank, prune))
+
+    def _ensure_capacity(self, n: int):
+        if self.results is not None and self.results.shape[0] >= n:
+            return
+        self._release()
+        capacity = max(n, 64)
+        self.results = SharedArray((capacity,), RESULT_DTYPE)
+        self.traces = SharedArray((capacity, self.trace_bytes), np.uint8)
+
+    def _release(self):
+        for shared in (self.results, self.traces):
+            if shared is not None:
+                shared.close(unlink=True)
+        self.results = self.traces = None
+
+    def submit(self, genomes, config) -> tuple:
+        """Starts playing the games of `genomes` and returns at once; the
+        genomes may be changed meanwhile, the workers have their own copies.
+        The results are only applied by collect()."""
+        import simulation
+        seed = simulation.generation + 1
+        scenario_index = None
+        if self.scenario_bank is not None:
+            scenario_index = (seed - 1) % len(self.scenario_bank)
+        start = perf_counter()
+        genomes = list(genomes)
+        self._ensure_capacity(len(genomes))
+        tasks = [(slot, encode_genome(genome)) for slot, (_, genome) in enumerate(genomes)]
+        # a few chunks per worker, so a slow chunk doesn't hold up the others
+        size = max(1, -(-len(tasks) // (self.workers * 4)))
+        futures = [self._executor.submit(_evaluate_chunk, self.results, self.traces, seed,
+                                         scenario_index, tasks[i:i + size])
+                   for i in range(0, len(tasks), size)]
+        return genomes, seed, scenario_index, futures, start
+
+    def collect(self, pending: tuple):
+        """Waits for the games started by submit() and sets the fitness
+        (and trace) of their genomes."""
+        import simulation
+        genomes, seed, scenario_index, futures, start = pending
+        for future in futures:
+            future.result()
+        simulation.generation = seed
+
+        results = self.results.array[:len(genomes)]
+        truncated = 0
+        for slot, (_, genome) in enumerate(genomes):
+            genome.fitness = float(results["fitness"][slot])
+            if not self.trace_bytes:
+                continue
+            frames = int(results["trace_frames"][slot])
+            truncated += frames < results["frames"][slot]
+            genome.trace = DecisionTrace(seed, frames, self.traces.array[slot, :(frames + 3) // 4],
+                                         -1 if scenario_index is None else scenario_index)
+        skipped = int(results["skipped"].sum())
+        simulated = int(results["frames"].sum()) - skipped
+        simulation.frames_simulated += simulated
+        self.last_seconds = perf_counter() - start
+        print(f"Evaluated {len(genomes)} genomes in {self.workers} processes"
+              f" in {self.last_seconds:.2f} s")
+        if self.prune:
+            simulation.print_prune_report(int((results["skipped"] > 0).sum()), skipped, simulated)
+        if truncated:
+            print(f"{truncated} traces truncated to their first {self.trace_bytes * 4} frames")
+
+    def __call__(self, genomes, config):
+        self.collect(self.submit(genomes, config))
+
+    def close(self):
+        """Stops the workers, dropping the games not started yet (a generation
+        submitted ahead when the run failed), and frees the shared memory."""
+        self._executor.shutdown(cancel_futures=True)
+        self._release()
@@ -0,0 +1,88 @@
+import neat
+from neat.population import CompleteExtinctionException
+
+COPIED_FROM = "1.1.0" # neat-python version whose Population.run is mirrored below
+
+class SerialEvaluation:
+    """submit/collect interface over a plain fitness function, which then
+    runs entirely in collect()."""
+    def __init__(self, fitness_function):
+        self.fitness_function = fitness_function
+
+    def submit(self, genomes, config):
+        return list(genomes), config
+
+    def collect(self, pending):
+        self.fitness_function(*pending)
+
+def run_pipelined(p: neat.Population, evaluator, n: int | None = None):
+    """Population.run, with the evaluation of each generation started as
+    soon as it exists: right after reproduction and speciation. Only the
+    end_generation reporters of the previous generation (the checkpoint)
+    overlap with it. post_evaluate (statistics, champion export, StdOut)
+    still runs before reproduction, on the critical path.
+
+    `evaluator` has submit(genomes, config) -> pending, which must not
+    block, and collect(pending), which sets the fitness of the genomes
+    (see parallel_eval.ParallelEvaluator). Only a ParallelEvaluator can
+    actually play while the parent reports; with SerialEvaluation
+    everything runs in collect(), as in Population.run. Reporters are
+    called in the same order as by Population.run; only the evaluation
+    moves earlier.
+
+    This is a copy of Population.run from neat-python COPIED_FROM and has
+    to be kept in step with it when neat is upgraded.
+    """
+    if neat.__version__ != COPIED_FROM:
+        print(f"run_pipelined mirrors Population.run of neat-python {COPIED_FROM},"
+              f" neat-python {neat.__version__} is installed")
+    config = p.config
+    if config.no_fitness_termination and n is None:
+        raise RuntimeError("Cannot have no generational limit with no fitness termination")
+
+    pending = None
+    k = 0
+    while n is None or k < n:
+        k += 1
+        if pending is None:
+            pending = evaluator.submit(list(p.population.items()), config)
+        p.reporters.start_generation(p.generation)
+        evaluator.collect(pending)
+        pending = None
+
+        best = None
+        for g in p.population.values():
+            if g.fitness is None:
+                raise RuntimeError(f"Fitness not assigned to genome {g.key}")
+            if best is None or g.fitness > best.fitness:
+                best = g
+        p.reporters.post_evaluate(config, p.population, p.species, best)
+
+        if p.best_genome is None or best.fitness > p.best_genome.fitness:
+            p.best_genome = best
+
+        if not config.no_fitness_termination:
+            fv = p.fitness_criterion(g.fitness for g in p.population.values())
+            if fv >= config.fitness_threshold:
+                p.reporters.found_solution(config, p.generation, best)
+                break
+
+        p.population = p.reproduction.reproduce(config, p.species, config.pop_size, p.generation)
+        if not p.species.species:
+            p.reporters.complete_extinction()
+            if config.reset_on_extinction:
+                p.population = p.reproduction.create_new(config.genome_type,
+                                                         config.genome_config, config.pop_size)
+            else:
+                raise CompleteExtinctionException()
+        p.species.speciate(config, p.population, p.generation)
+
+        # The next generation starts playing while this one is reported
+        if n is None or k < n:
+            pending = evaluator.submit(list(p.population.items()), config)
+        p.reporters.end_generation(config, p.population, p.species)
+        p.generation += 1
+
+    if config.no_fitness_termination:
+        p.reporters.found_solution(config, p.generation, p.best_genome)
+    return p.best_genome
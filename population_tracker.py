@@ -0,0 +1,205 @@
+import neat
+
+import heapq
+import itertools
+import math
+
+class FenwickCounter:
+    """Counts of non-negative integer keys: add, rank and k-th smallest
+    in O(log n). Grows when a key beyond its size shows up."""
+    def __init__(self, size: int = 64):
+        self.tree = [0] * (size + 1)
+        self.total = 0
+
+    def _grow(self, key: int):
+        counts = [self.count(k) for k in range(len(self.tree) - 1)]
+        size = len(self.tree) - 1
+        while size <= key:
+            size *= 2
+        self.tree = [0] * (size + 1)
+        self.total = 0
+        for k, c in enumerate(counts):
+            if c:
+                self.add(k, c)
+
+    def add(self, key: int, delta: int = 1):
+        if key >= len(self.tree) - 1:
+            self._grow(key)
+        self.total += delta
+        i = key + 1
+        while i < len(self.tree):
+            self.tree[i] += delta
+            i += i & -i
+
+    def count_le(self, key: int) -> int:
+        i = min(key + 1, len(self.tree) - 1)
+        total = 0
+        while i > 0:
+            total += self.tree[i]
+            i -= i & -i
+        return total
+
+    def count(self, key: int) -> int:
+        return self.count_le(key) - (self.count_le(key - 1) if key > 0 else 0)
+
+    def kth(self, k: int) -> int:
+        """Key of the k-th smallest element (0-based)."""
+        pos = 0
+        step = 1 << (len(self.tree) - 1).bit_length()
+        while step:
+            nxt = pos + step
+            if nxt < len(self.tree) and self.tree[nxt] <= k:
+                pos = nxt
+                k -= self.tree[nxt]
+            step >>= 1
+        return pos
+
+FITNESS_OFFSET = 64 # fitness keys are floor(fitness) + offset, deaths go down to ~-25
+
+class PopulationTracker:
+    """Live statistics of the frogs being simulated, kept up to date
+    incrementally instead of scanning every simulation every frame.
+
+    - leader: lazy max-heap of (fitness, arrival order), stale entries are
+      dropped when they reach the top
+    - fitness percentiles: Fenwick counter over fitness rounded down to 1
+    - distances: Fenwick counter plus the alive simulations of each distance
+      (the frogs visible in the leader's world)
+    Calling `update(sim)` after every step costs O(1) if nothing changed,
+    O(log n) otherwise.
+    """
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self._heap = []
+        self._order = itertools.count()
+        self._seq = itertools.count() # tie-breaker, sims are not comparable
+        self._state = {} # id(sim) -> (fitness, distance, arrival order)
+        self.fitness = FenwickCounter()
+        self.distance = FenwickCounter()
+        self.by_distance: dict[int, dict[int, object]] = {}
+        self.final_fitness = FenwickCounter() # frogs that finished this generation
+        self.final_distance = FenwickCounter()
+        self.finished = 0
+
+    @staticmethod
+    def _key(fitness: float) -> int:
+        return max(0, math.floor(fitness) + FITNESS_OFFSET)
+
+    def add(self, sim):
+        order = next(self._order)
+        fitness, distance = sim.genome.fitness, sim.distance_score
+        self._state[id(sim)] = (fitness, distance, order)
+        heapq.heappush(self._heap, (-fitness, order, next(self._seq), sim))
+        self.fitness.add(self._key(fitness))
+        self.distance.add(distance)
+        self.by_distance.setdefault(distance, {})[id(sim)] = sim
+
+    def update(self, sim):
+        fitness, distance, order = self._state[id(sim)]
+        new_fitness, new_distance = sim.genome.fitness, sim.distance_score
+        if new_fitness == fitness and new_distance == distance:
+            return
+        self._state[id(sim)] = (new_fitness, new_distance, order)
+        if new_fitness != fitness:
+            heapq.heappush(self._heap, (-new_fitness, order, next(self._seq), sim))
+            self.fitness.add(self._key(fitness), -1)
+            self.fitness.add(self._key(new_fitness))
+            if len(self._heap) > 4 * len(self._state) + 64:
+                self._compact()
+        if new_distance != distance:
+            self.distance.add(distance, -1)
+            self.distance.add(new_distance)
+            del self.by_distance[distance][id(sim)]
+            self.by_distance.setdefault(new_distance, {})[id(sim)] = sim
+
+    def remove(self, sim):
+        """The frog died: its final result goes to the generation summary."""
+        self.update(sim)
+        fitness, distance, _ = self._state.pop(id(sim))
+        self.fitness.add(self._key(fitness), -1)
+        self.distance.add(distance, -1)
+        del self.by_distance[distance][id(sim)]
+        self.final_fitness.add(self._key(fitness))
+        self.final_distance.add(distance)
+        self.finished += 1
+
+    def _valid(self, entry) -> bool:
+        neg_fitness, order, _, sim = entry
+        state = self._state.get(id(sim))
+        return state is not None and state[2] == order and state[0] == -neg_fitness
+
+    def _compact(self):
+        self._heap = [entry for entry in self._heap if self._valid(entry)]
+        heapq.heapify(self._heap)
+
+    @property
+    def alive(self) -> int:
+        return len(self._state)
+
+    @property
+    def leader(self):
+        """Fittest alive simulation, the earliest arrived among equals."""
+        while self._heap and not self._valid(self._heap[0]):
+            heapq.heappop(self._heap)
+        return self._heap[0][3] if self._heap else None
+
+    def top(self, k: int) -> list:
+        """The k fittest alive simulations, best first."""
+        best = []
+        seen = set()
+        while self._heap and len(best) < k:
+            entry = heapq.heappop(self._heap)
+            if self._valid(entry) and id(entry[3]) not in seen:
+                seen.add(id(entry[3]))
+                best.append(entry)
+        for entry in best:
+            heapq.heappush(self._heap, entry)
+        return [entry[3] for entry in best]
+
+    def at_distance(self, distance: int) -> list:
+        return list(self.by_distance.get(distance, {}).values())
+
+    @staticmethod
+    def _percentile(counter: FenwickCounter, q: float, offset: int = 0) -> int | None:
+        if counter.total == 0:
+            return None
+        return counter.kth(min(counter.total - 1, int(q * counter.total))) - offset
+
+    def fitness_percentile(self, q: float) -> int | None:
+        """Fitness (rounded down) below which a fraction q of the alive frogs is."""
+        return self._percentile(self.fitness, q, FITNESS_OFFSET)
+
+    def distance_histogram(self, final: bool = False) -> list[int]:
+        counter = self.final_distance if final else self.distance
+        if counter.total == 0:
+            return []
+        last = counter.kth(counter.total - 1)
+        return [counter.count(d) for d in range(last + 1)]
+
+    def stats(self) -> dict:
+        leader = self.leader
+        return {
+            "alive": self.alive,
+            "leader_fitness": None if leader is None else leader.genome.fitness,
+            "leader_distance": None if leader is None else leader.distance_score,
+            "p50": self.fitness_percentile(0.5),
+            "p90": self.fitness_percentile(0.9),
+        }
+
+class PopulationStatsReporter(neat.reporting.BaseReporter):
+    """Prints the distance histogram and fitness percentiles of the frogs
+    that finished the generation, as collected by a PopulationTracker."""
+    def __init__(self, tracker: PopulationTracker):
+        self.tracker = tracker
+
+    def post_evaluate(self, config, population, species, best_genome):
+        tracker = self.tracker
+        if tracker.finished == 0:
+            return
+        p = [PopulationTracker._percentile(tracker.final_fitness, q, FITNESS_OFFSET)
+             for q in (0.1, 0.5, 0.9)]
+        print(f"Fitness percentiles (10/50/90): {p[0]} / {p[1]} / {p[2]}")
+        print("Lanes crossed histogram: " + " ".join(
+            f"{d}:{c}" for d, c in enumerate(tracker.distance_histogram(final=True)) if c))
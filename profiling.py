@@ -0,0 +1,71 @@
+import resource
+import sys
+import tracemalloc
+
+def reset_peak_rss():
+    """Restarts the peak RSS measurement (Linux only, elsewhere the
+    peak stays the one of the whole process lifetime)."""
+    try:
+        with open("/proc/self/clear_refs", "w") as f:
+            f.write("5")
+    except OSError:
+        pass
+
+def peak_rss_mb() -> float:
+    """Peak resident memory since the last reset_peak_rss, in MB."""
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # kilobytes on Linux, bytes on macOS
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+class AllocationProfiler:
+    """Per generation tracemalloc report: how much the memory retained
+    grew over the generation (compared snapshots of its start and end),
+    the `top` source lines responsible for it, and the traced peak.
+    Transient allocations, freed before the generation ends, don't show
+    up in the growth, only in the peak.
+
+    Only memory allocated through Python is traced: the pixels of a
+    pygame Surface are not, its Surface object is (so surfaces still show
+    up in the block counts). Tracing slows everything down, it is opt-in.
+    """
+    def __init__(self, top: int = 10, depth: int = 1):
+        self.top = top
+        self.depth = depth
+        self._snapshot = None
+
+    def start_generation(self):
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(self.depth)
+        tracemalloc.reset_peak()
+        self._snapshot = tracemalloc.take_snapshot()
+
+    def report(self, frames: int):
+        snapshot = tracemalloc.take_snapshot()
+        _, peak = tracemalloc.get_traced_memory()
+        filters = [tracemalloc.Filter(False, tracemalloc.__file__)]
+        stats = snapshot.filter_traces(filters).compare_to(
+            self._snapshot.filter_traces(filters), "lineno")
+        grown = sum(stat.size_diff for stat in stats if stat.size_diff > 0)
+        blocks = sum(stat.count_diff for stat in stats if stat.count_diff > 0)
+        frames = max(frames, 1)
+        print(f"Retained growth this generation: {grown / 1024:.1f} KiB in {blocks} blocks"
+              f" ({grown / frames:.0f} bytes per simulated frame),"
+              f" peak {peak / (1024 * 1024):.1f} MB traced")
+        stats.sort(key=lambda stat: stat.size_diff, reverse=True)
+        for stat in stats[:self.top]:
+            if stat.size_diff <= 0:
+                break
+            frame = stat.traceback[0]
+            print(f"  {stat.size_diff / 1024:9.1f} KiB {stat.count_diff:+7d} blocks"
+                  f"  {frame.filename}:{frame.lineno}")
+        self._snapshot = None
+
+    def stop(self):
+        tracemalloc.stop()
@@ -0,0 +1,119 @@
+import pygame
+
+from time import perf_counter
+
+class DirtyRenderer:
+    """Draws lanes, obstacles and frogs updating only what moved.
+
+    The lane backgrounds are composited once into a cached surface and
+    recomposited only when the lanes change (a new line or a slide).
+    On every other frame the rects drawn in the previous frame are
+    restored from the cache, the moving sprites are blitted again and
+    only those rects are sent to `pygame.display.update`.
+    """
+    def __init__(self, screen: pygame.Surface,
+                 background_color="black", show_stats: bool = True):
+        self.screen = screen
+        self.background = pygame.Surface(screen.get_size())
+        self.background_color = background_color
+        self.show_stats = show_stats
+        self.font = pygame.font.Font(None, 20)
+        self.clock = pygame.time.Clock() # uncapped, only measures frame time
+        self.draw_ms = 0.0
+        self._lanes_key = None
+        self._last_rects: list[pygame.Rect] = []
+
+    def _composite(self, lines):
+        self.background.fill(self.background_color)
+        for line in lines:
+            self.background.blit(line.image, line.rect)
+
+    def _draw_stats(self) -> pygame.Rect:
+        text = self.font.render(
+            f"{self.clock.get_fps():5.1f} fps | frame {self.clock.get_time():3d} ms"
+            f" | draw {self.draw_ms:4.1f} ms", True, "white")
+        box = text.get_rect(topleft=(4, 4)).inflate(6, 4)
+        self.screen.fill((0, 0, 0), box)
+        self.screen.blit(text, (box.x + 3, box.y + 2))
+        return box
+
+    def draw(self, lines, frogs, highlight: tuple[int, int] | None = None):
+        """Draws one frame: `lines` in order, their obstacles, then `frogs`
+        on top. `highlight` is the center of the leader's golden circle."""
+        start = perf_counter()
+        self.clock.tick()
+
+        lanes_key = tuple((id(line), id(line.image), line.rect.y) for line in lines)
+        full_redraw = lanes_key != self._lanes_key
+        if full_redraw:
+            self._lanes_key = lanes_key
+            self._composite(lines)
+            self.screen.blit(self.background, (0, 0))
+        else:
+            # erase last frame's sprites
+            for rect in self._last_rects:
+                self.screen.blit(self.background, rect, rect)
+
+        rects = []
+        for line in lines:
+            for obs in line.obstacles:
+                rects.append(self.screen.blit(obs.image, obs.rect))
+        for frog in frogs:
+            rects.append(self.screen.blit(frog.image, frog.rect))
+        if highlight is not None:
+            rects.append(pygame.draw.circle(self.screen, (255, 215, 0), highlight, 20, 2))
+        if self.show_stats:
+            rects.append(self._draw_stats())
+
+        if full_redraw:
+            pygame.display.update()
+        else:
+            pygame.display.update(self._last_rects + rects)
+        self._last_rects = rects
+        self.draw_ms = (perf_counter() - start) * 1000
+
+class _SpriteView:
+    """What DirtyRenderer reads from a lane, obstacle or frog."""
+    __slots__ = ("image", "rect", "obstacles")
+
+class Interpolator:
+    """Lets frames drawn between two logic ticks show lanes, obstacles and
+    frogs part of the way between their previous and current positions.
+
+    Call `save` right before each logic tick and `views(..., alpha)` to get
+    drawable stand-ins, alpha being the fraction of the next tick elapsed.
+    Lane stand-ins are reused, so DirtyRenderer's lane cache still works.
+    """
+    def __init__(self):
+        self._previous: dict[object, tuple[int, int]] = {} # sprite -> topleft
+        self._lanes: dict[object, _SpriteView] = {}
+
+    def save(self, lines, frogs):
+        previous = {}
+        for line in lines:
+            previous[line] = line.rect.topleft
+            for obs in line.obstacles:
+                previous[obs] = obs.rect.topleft
+        for frog in frogs:
+            previous[frog] = frog.rect.topleft
+        self._previous = previous
+
+    def _view(self, sprite, alpha: float, view: _SpriteView | None = None) -> _SpriteView:
+        if view is None:
+            view = _SpriteView()
+        view.image = sprite.image
+        view.rect = sprite.rect.copy()
+        start = self._previous.get(sprite)
+        if start is not None: # new sprites are drawn where they are
+            view.rect.x = round(start[0] + (view.rect.x - start[0]) * alpha)
+            view.rect.y = round(start[1] + (view.rect.y - start[1]) * alpha)
+        return view
+
+    def views(self, lines, frogs, alpha: float):
+        lanes = {}
+        for line in lines:
+            view = self._view(line, alpha, self._lanes.get(line))
+            view.obstacles = [self._view(obs, alpha) for obs in line.obstacles]
+            lanes[line] = view
+        self._lanes = lanes
+        return list(lanes.values()), [self._view(frog, alpha) for frog in frogs]
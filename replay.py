@@ -0,0 +1,100 @@
+from types import SimpleNamespace
+from decision_trace import DecisionTrace
+from simulation import SingleSimulation
+from sprites import frog_image
+
+KEYFRAME_INTERVAL = 120 # frames between two keyframe snapshots
+
+class ReplaySimulation(SingleSimulation):
+    """A SingleSimulation whose decisions are read from a trace instead
+    of being computed by a network. The world is rebuilt from the trace seed,
+    so the game unfolds exactly as it did during the evolution.
+    Traces of scenario worlds need the same `bank` they were played on."""
+    def __init__(self, trace: DecisionTrace, bank=None):
+        self.genome = SimpleNamespace(fitness=0) # only the fitness is needed
+        self.net = None
+        if trace.scenario >= 0 and bank is None:
+            raise ValueError(f"Trace played scenario {trace.scenario}, its scenario bank is needed")
+        self.setup_world(trace.seed, None if trace.scenario < 0 else bank[trace.scenario])
+        self.source = trace
+
+    def decide(self) -> int:
+        return self.source[self.frames_survived - 1]
+
+    @property
+    def finished(self) -> bool:
+        return not self.alive or self.frames_survived >= len(self.source)
+
+def snapshot_state(sim: SingleSimulation) -> dict:
+    """Everything that changes while playing, rng state included."""
+    frog = sim.frog
+    return {
+        "rng": sim.rng.getstate(),
+        "steps_taken": sim.gen.steps_taken,
+        "lines": [(line, line.rect.copy(), line.target_y, line.spawn_timer,
+                   None if line.plan is None else line.plan.getstate(),
+                   [(obs, obs.rect.copy()) for obs in line.obstacles])
+                  for line in sim.lines],
+        "frog": (frog.rect.copy(), frog.hitbox.copy(), frog.move_cooldown, frog.heading),
+        "counters": (sim.alive, sim.frames_survived, sim.distance_score,
+                     sim.stagnation_timer, sim.genome.fitness),
+    }
+
+def restore_state(sim: SingleSimulation, state: dict):
+    sim.rng.setstate(state["rng"])
+    sim.gen.steps_taken = state["steps_taken"]
+    # Lines and obstacles are put back in place with their saved positions,
+    # sprites created after the keyframe are simply dropped
+    sim.lines[:] = [line for line, *_ in state["lines"]]
+    for line, rect, target_y, spawn_timer, plan_state, obstacles in state["lines"]:
+        line.rect = rect.copy()
+        line.target_y = target_y
+        line.spawn_timer = spawn_timer
+        if plan_state is not None:
+            line.plan.setstate(plan_state)
+        line.obstacles.empty()
+        for obs, obs_rect in obstacles:
+            obs.rect = obs_rect.copy()
+            line.obstacles.add(obs)
+    rect, hitbox, cooldown, heading = state["frog"]
+    frog = sim.frog
+    frog.rect = rect.copy()
+    frog.hitbox = hitbox.copy()
+    frog.move_cooldown = cooldown
+    frog.heading = heading
+    frog.image = frog_image(heading)
+    (sim.alive, sim.frames_survived, sim.distance_score,
+     sim.stagnation_timer, sim.genome.fitness) = state["counters"]
+    sim.refresh_lane_features()
+
+class Replay:
+    """Plays a trace back, with seeking. The whole game is simulated once
+    at load time storing a keyframe every KEYFRAME_INTERVAL frames; seeking
+    restores the closest keyframe before the target and steps from there."""
+    def __init__(self, trace: DecisionTrace, bank=None,
+                 keyframe_interval: int = KEYFRAME_INTERVAL):
+        self.trace = trace
+        self.keyframe_interval = keyframe_interval
+        self.sim = ReplaySimulation(trace, bank)
+        self.keyframes = [snapshot_state(self.sim)]
+        while not self.sim.finished:
+            self.sim.update()
+            if self.sim.frames_survived % keyframe_interval == 0:
+                self.keyframes.append(snapshot_state(self.sim))
+        self.total_frames = self.sim.frames_survived
+        self.final_fitness = self.sim.genome.fitness
+        self.seek(0)
+
+    @property
+    def frame(self) -> int:
+        return self.sim.frames_survived
+
+    def step(self):
+        if not self.sim.finished:
+            self.sim.update()
+
+    def seek(self, frame: int):
+        frame = max(0, min(frame, self.total_frames))
+        restore_state(self.sim, self.keyframes[frame // self.keyframe_interval])
+        while self.frame < frame:
+            self.sim.update()
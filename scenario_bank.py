@@ -0,0 +1,130 @@
+import numpy as np
+
+import argparse
+import random
+import struct
+from game_logics import next_texture
+from sprites import CAR_SPEEDS, LOG_SPEEDS, Texture
+
+# file header: magic, format version, scenarios, lanes per scenario, spawns per lane
+_HEADER = struct.Struct("<4sBxxxIII")
+_MAGIC = b"FRSB"
+_VERSION = 1
+
+N_LANES = 256 # lanes 0-4 are the initial ones, then one per step forward
+N_SPAWNS = 64 # pre-drawn spawns per lane, then the schedule repeats
+
+def lane_dtype(n_spawns: int) -> np.dtype:
+    return np.dtype([
+        ("texture", "u1"),
+        ("speed", "<f4"),
+        ("jitter", "i1", (n_spawns,)), # added to spawn_rate after each spawn
+        ("long_log", "u1", (n_spawns,)), # 1 LONGLOG, 0 SHORTLOG
+    ])
+
+class LanePlan:
+    """Pre-drawn randomness of one lane, used by Line instead of its rng."""
+    __slots__ = ("speed", "_jitter", "_long_log", "_spawns", "_logs")
+
+    def __init__(self, record: np.void):
+        speed = float(record["speed"])
+        self.speed = int(speed) if speed.is_integer() else speed
+        self._jitter = record["jitter"]
+        self._long_log = record["long_log"]
+        self._spawns = 0
+        self._logs = 0
+
+    def next_jitter(self) -> int:
+        jitter = int(self._jitter[self._spawns % len(self._jitter)])
+        self._spawns += 1
+        return jitter
+
+    def getstate(self) -> tuple[int, int]:
+        return self._spawns, self._logs
+
+    def setstate(self, state: tuple[int, int]):
+        self._spawns, self._logs = state
+
+    def choice(self, logs: list):
+        """Picks the next log of the schedule from [SHORTLOG, LONGLOG]."""
+        pick = logs[self._long_log[self._logs % len(self._long_log)]]
+        self._logs += 1
+        return pick
+
+class Scenario:
+    """A pre-generated world, a row of the bank (no data is copied)."""
+    def __init__(self, lanes: np.ndarray, index: int = -1):
+        self.lanes = lanes
+        self.index = index # position in the bank
+
+    def has_lane(self, index: int) -> bool:
+        return index < len(self.lanes)
+
+    def texture(self, index: int) -> Texture:
+        return Texture(int(self.lanes[index]["texture"]))
+
+    def lane(self, index: int) -> LanePlan | None:
+        return LanePlan(self.lanes[index]) if self.has_lane(index) else None
+
+class ScenarioBank:
+    """Read-only memory map of a scenario bank file. Worker processes
+    opening the same file share its pages instead of copying them, and
+    pickling a bank only sends its path."""
+    def __init__(self, path: str):
+        self.path = path
+        with open(path, "rb") as f:
+            magic, version, n_scenarios, n_lanes, n_spawns = _HEADER.unpack(f.read(_HEADER.size))
+        if magic != _MAGIC or version != _VERSION:
+            raise ValueError("Not a scenario bank file")
+        self.data = np.memmap(path, dtype=lane_dtype(n_spawns), mode="r",
+                              offset=_HEADER.size, shape=(n_scenarios, n_lanes))
+
+    def __reduce__(self):
+        return (ScenarioBank, (self.path,))
+
+    def __len__(self) -> int:
+        return self.data.shape[0]
+
+    def __getitem__(self, index: int) -> Scenario:
+        return Scenario(self.data[index], index)
+
+def generate_scenario(rng: random.Random, lanes: np.ndarray):
+    """Fills `lanes` with the draws Line and LevelGenerator would make,
+    ordered by lane instead of by the time they are needed."""
+    n_spawns = lanes.dtype["jitter"].shape[0]
+    textures = [Texture.GRASS, Texture.ASPHALT, Texture.ASPHALT, Texture.GRASS, Texture.WATER]
+    while len(textures) < len(lanes):
+        textures.append(next_texture(textures[-1], len(textures) - 4, rng))
+    for i, texture in enumerate(textures):
+        lanes["texture"][i] = texture.value
+        if texture == Texture.ASPHALT:
+            lanes["speed"][i] = rng.choice(CAR_SPEEDS)
+        elif texture == Texture.WATER:
+            lanes["speed"][i] = rng.choice(LOG_SPEEDS)
+        if texture != Texture.GRASS:
+            lanes["jitter"][i] = [rng.randint(-5, 20) for _ in range(n_spawns)]
+            lanes["long_log"][i] = [rng.random() < 0.5 for _ in range(n_spawns)]
+
+def generate_bank(path: str, n_scenarios: int, first_seed: int = 0,
+                  n_lanes: int = N_LANES, n_spawns: int = N_SPAWNS):
+    """Writes `n_scenarios` worlds, scenario i drawn from random.Random(first_seed + i)."""
+    dtype = lane_dtype(n_spawns)
+    with open(path, "wb") as f:
+        f.write(_HEADER.pack(_MAGIC, _VERSION, n_scenarios, n_lanes, n_spawns))
+        f.truncate(_HEADER.size + n_scenarios * n_lanes * dtype.itemsize)
+    data = np.memmap(path, dtype=dtype, mode="r+",
+                     offset=_HEADER.size, shape=(n_scenarios, n_lanes))
+    for i in range(n_scenarios):
+        generate_scenario(random.Random(first_seed + i), data[i])
+    data.flush()
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Pre-generate a bank of seeded worlds")
+    parser.add_argument("path")
+    parser.add_argument("-n", "--scenarios", type=int, default=200)
+    parser.add_argument("--first-seed", type=int, default=0)
+    parser.add_argument("--lanes", type=int, default=N_LANES)
+    parser.add_argument("--spawns", type=int, default=N_SPAWNS)
+    args = parser.parse_args()
+    generate_bank(args.path, args.scenarios, args.first_seed, args.lanes, args.spawns)
+    print(f"{args.scenarios} scenarios written to {args.path}")
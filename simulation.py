@@ -1,5 +1,7 @@
 import pygame
 import neat
+import argparse
+import itertools
 import os
 import math
 import random
@@ -7,18 +9,34 @@ from time import sleep
 from game_config import SCREEN_WIDTH, SCREEN_HEIGHT, FPS
 from game_logics import LevelGenerator
 from sprites import Frog, Line, Texture
+from spectator import Spectator, take_snapshot
+from renderer import DirtyRenderer
+from decision_trace import save_trace, DecisionTrace
+from trajectory import TrajectoryRecorder
+from scenario_bank import ScenarioBank
+from lane_model import LaneModel
+from profiling import AllocationProfiler, peak_rss_mb, reset_peak_rss
+from population_tracker import PopulationTracker, PopulationStatsReporter
+from streaming_stats import StreamingStatisticsReporter
+from checkpoint import BackgroundCheckpointer, latest_checkpoint, restore_checkpoint
+from speciation import with_distance_cache
+from champion_export import ChampionExporter
+from novelty import NoveltyArchive, X_BINS, behaviour_descriptor, x_bin
+from parallel_eval import ParallelEvaluator
+from pipeline import run_pipelined
 
 
 generation = 0
+spectator: Spectator | None = None # set by run_neat(spectator=True)
+recorder: TrajectoryRecorder | None = None # set by run_neat(record_dir=...)
+scenario_bank: ScenarioBank | None = None # set by run_neat(scenario_bank_file=...)
+tracker = PopulationTracker() # leader and live stats of the current generation
 
 # Helper to reorder lines for all game instances
 def reorder_lines(lines):
     for i, line in enumerate(lines):
         line.goto_level(i)
 
-def hitbox_collision(sprite_a, sprite_b):
-    return sprite_a.hitbox.colliderect(sprite_b.rect)
-
 def print_genome_topology(genome, config):
     print("\n" + "="*40)
     print(" BEST GENOME TOPOLOGY ")
@@ -74,39 +92,194 @@ def print_genome_topology(genome, config):
         print(f"{src:>15}  -->  {tgt:<10}  [{conn.weight:+.2f}] {weight_bar}")
 
 
+def resting_lognormalized(stagnation_timer: int) -> float:
+    return -1 + 2*math.log2(stagnation_timer+1)/math.log2(480)
+
+# the stagnation timer never exceeds 481 (death), no need for log2 every frame
+RESTING_LOG_TABLE = [resting_lognormalized(t) for t in range(482)]
+
+# Layout of the 20 inputs: [resting, edge] then, per level, road, water,
+# speed (levels 0-2 only) and the nearest obstacles (2, 2, 1, 0, 0)
+LANE_INPUTS = [2, 7, 12, 16, 18] # index of the road flag of each level
+OBSTACLE_INPUTS = [(0, 5, 2), (1, 10, 2), (2, 15, 1)] # (level, first index, how many)
+NUM_INPUTS = 20
+LANE_FEATURES = 13 # ground types and speeds, kept up to date by refresh_lane_features
+
+class InputPlan:
+    """Which of the per-frame inputs a network actually reads: inputs no
+    enabled connection leaves from are not computed (their values stay stale).
+    The nearest obstacles of a lane are only searched for as far as needed."""
+    __slots__ = ("resting", "edge", "obstacles", "size")
+
+    def __init__(self, used: set[int]):
+        self.resting = 0 in used
+        self.edge = 1 in used
+        # (level, first index, how many nearest obstacles are needed)
+        self.obstacles = []
+        for lev, first, count in OBSTACLE_INPUTS:
+            needed = [i + 1 for i in range(count) if first + i in used]
+            if needed:
+                self.obstacles.append((lev, first, max(needed)))
+        self.size = (LANE_FEATURES + self.resting + self.edge
+                     + sum(k for _, _, k in self.obstacles))
+
+    @classmethod
+    def for_network(cls, net: neat.nn.FeedForwardNetwork) -> "InputPlan":
+        # input keys are -1 .. -NUM_INPUTS
+        return cls({-key - 1 for *_, links in net.node_evals for key, _ in links if key < 0})
+
+FULL_INPUT_PLAN = InputPlan(set(range(NUM_INPUTS)))
+
+OBSTACLE_MARGIN = 200 # obstacles live between -OBSTACLE_MARGIN and SCREEN_WIDTH + OBSTACLE_MARGIN
+OBSTACLE_TRAVEL = SCREEN_WIDTH + 101 # pixels at least from spawn (center 100 px off screen) to removal
+SPAWN_JITTER_MAX = 20 # spawn timers restart at spawn_rate + randint(-5, 20)
+PROOF_MARGIN = 1e-9 # REST must win by more than float rounding
+PRUNE_FIRST_CHECK = 30 # frames of rest before the first will_rest_forever, each retry waits twice as long
+# activations that never decrease, bounds go through them
+MONOTONE_ACTIVATIONS = {"sigmoid_activation", "tanh_activation", "relu_activation",
+                        "softplus_activation", "identity_activation", "clamped_activation",
+                        "elu_activation", "lelu_activation", "selu_activation",
+                        "exp_activation", "log_activation", "cube_activation"}
+# among those, the ones whose slope rises then falls (or only one of both)
+UNIMODAL_SLOPE_ACTIVATIONS = MONOTONE_ACTIVATIONS - {"cube_activation"}
+
+def network_bounds(net: neat.nn.FeedForwardNetwork, lows: list[float],
+                   highs: list[float]) -> list[tuple[float, float]] | None:
+    """(lowest, highest) value of each output of `net` for inputs anywhere
+    between `lows` and `highs` (interval arithmetic). None if a node
+    aggregates other than by sum or has a non-monotone activation."""
+    values = {key: (low, high) for key, low, high in zip(net.input_nodes, lows, highs)}
+    for node, act, agg, bias, response, links in net.node_evals:
+        if agg.__name__ != "sum_aggregation" or act.__name__ not in MONOTONE_ACTIVATIONS:
+            return None
+        low = high = 0.0
+        for i, w in links:
+            a, b = values.get(i, (0.0, 0.0))
+            low += min(a * w, b * w)
+            high += max(a * w, b * w)
+        low, high = sorted((bias + response * low, bias + response * high))
+        values[node] = (act(low), act(high))
+    return [values.get(key, (0.0, 0.0)) for key in net.output_nodes]
+
+def always_beats(net: neat.nn.FeedForwardNetwork, winner: int, loser: int,
+                 lows: list[float], highs: list[float]) -> bool:
+    """True if output `winner` of `net` is above output `loser` by more than
+    PROOF_MARGIN for all inputs between `lows` and `highs`, when both are
+    fed straight from the inputs through the same activation.
+
+    Unlike network_bounds this keeps the inputs the two outputs share:
+    the gap between their sums has an exact lowest value `gap`. Then
+    winner - loser >= act(z + gap) - act(z) for some z within the loser's
+    sum, and for the activations of UNIMODAL_SLOPE_ACTIVATIONS that
+    difference is smallest at one end of that range."""
+    nodes = {node: (act, agg, bias, response, links)
+             for node, act, agg, bias, response, links in net.node_evals}
+    if winner not in nodes or loser not in nodes:
+        return False
+    act, agg, bias, response, links = nodes[winner]
+    loser_act, loser_agg, loser_bias, loser_response, loser_links = nodes[loser]
+    if (act is not loser_act or act.__name__ not in UNIMODAL_SLOPE_ACTIVATIONS
+            or agg.__name__ != "sum_aggregation" or loser_agg.__name__ != "sum_aggregation"):
+        return False
+    index = {key: i for i, key in enumerate(net.input_nodes)}
+    weights = {}
+    for i, w in links:
+        if i not in index:
+            return False # fed by a hidden node
+        weights[i] = weights.get(i, 0.0) + response * w
+    gap = bias - loser_bias
+    low = high = loser_bias
+    for i, w in loser_links:
+        if i not in index:
+            return False
+        weights[i] = weights.get(i, 0.0) - loser_response * w
+        a, b = lows[index[i]] * loser_response * w, highs[index[i]] * loser_response * w
+        low += min(a, b)
+        high += max(a, b)
+    for i, w in weights.items():
+        gap += min(lows[index[i]] * w, highs[index[i]] * w)
+    if gap <= 0:
+        return False
+    return min(act(low + gap) - act(low), act(high + gap) - act(high)) > PROOF_MARGIN
+
 class SingleSimulation:
     """Manages a single Frog's game state within the population."""
-    def __init__(self, genome, config, seed):
-        self.genome = genome
-        self.net = neat.nn.FeedForwardNetwork.create(genome, config)
-        self.frog = Frog()
+    line_type = Line # lanes are pygame sprites
+    def __init__(self, genome, config, seed, scenario=None, net=None):
+        self.reset(genome, config, seed, scenario, net)
 
-        # 1. CREATE ISOLATED RNG WITH THE SHARED SEED
-        self.rng = random.Random(seed)
+    def reset(self, genome, config, seed, scenario=None, net=None):
+        """Starts a new game for `genome`, reusing this simulation. `net` is
+        the genome's network when already built (the genome then only needs
+        a key and a fitness)."""
+        self.genome = genome
+        self.net = neat.nn.FeedForwardNetwork.create(genome, config) if net is None else net
+        # trajectories record every input
+        self.input_plan = FULL_INPUT_PLAN if recorder is not None else InputPlan.for_network(self.net)
+        input_stats[0] += self.input_plan.size
+        input_stats[1] += 1
+        self.setup_world(seed, scenario)
+        # Every decision is recorded, the game can be replayed from (seed, trace)
+        genome.trace = self.trace
 
+    def setup_world(self, seed, scenario=None):
+        """Builds the world from `seed`, or from a pre-generated
+        scenario_bank.Scenario (the rng is then only used past its last lane)."""
+        self.seed = seed
+        self.trace = DecisionTrace(seed, scenario=-1 if scenario is None else scenario.index)
         # Each frog starts with the same initial 5-line setup
-        self.lines = [
-            Line(Texture.GRASS, rng=self.rng),
-            Line(Texture.ASPHALT, rng=self.rng),
-            Line(Texture.ASPHALT, rng=self.rng),
-            Line(Texture.GRASS, rng=self.rng),
-            Line(Texture.WATER, rng=self.rng)
-        ]
+        textures = [Texture.GRASS, Texture.ASPHALT, Texture.ASPHALT, Texture.GRASS, Texture.WATER]
+        plans = [None if scenario is None else scenario.lane(i) for i in range(len(textures))]
+        if getattr(self, "frog", None) is None:
+            self.frog = Frog()
+            # 1. CREATE ISOLATED RNG WITH THE SHARED SEED
+            self.rng = random.Random(seed)
+            self.lines = [self.line_type(texture, rng=self.rng, plan=plan)
+                          for texture, plan in zip(textures, plans)]
+            # We need a local generator for each frog to keep their worlds independent
+            self.gen = LevelGenerator(self.lines, rng=self.rng, scenario=scenario,
+                                      line_type=self.line_type)
+        else:
+            # a reused slot: the frog, rng, lines and generator start over in place
+            self.frog.reset()
+            self.rng.seed(seed)
+            for line, texture, plan in zip(self.lines, textures, plans):
+                line.reset(texture, rng=self.rng, plan=plan)
+            self.gen.reset(scenario)
         reorder_lines(self.lines)
         for line in self.lines:
-            line.rect.y = line.target_y
-            
-        self.all_sprites = pygame.sprite.Group(self.lines)
-        # We need a local generator for each frog to keep their worlds independent
-        self.gen = LevelGenerator(self.lines, rng=self.rng)
-        
+            line.y = line.target_y
+        self.inputs = [0.0] * NUM_INPUTS
+        self.refresh_lane_features()
+
         self.alive = True
+        self.next_prune_check = PRUNE_FIRST_CHECK # stagnation_timer of the next will_rest_forever
+        self.frames_skipped = 0
         self.frames_survived = 0
         self.distance_score = 0
         self.stagnation_timer = 0
+        # frames spent in each horizontal bin, for the behaviour descriptor
+        self.x_visits = [0] * X_BINS if novelty_archive is not None else None
         self.max_stagnation_frames = 180 # FPS * 3  # 3 seconds to make a step, then fitness will decrease
         self.max_stagnation_frames_to_death = 480 # FPS * 8  # if the frog doesn't move for 7 seconds it dies
 
+    def refresh_lane_features(self):
+        """Rewrites the inputs that only depend on which lines are visible
+        (ground type and speed), called when the lines shift."""
+        inputs = self.inputs
+        for lev, line in enumerate(self.lines):
+            # 1. Type & Speed
+            # type_val = 0 # 0 if it's grass
+            # if line.texture_type == Texture.WATER:
+            #     type_val = -1
+            # elif line.texture_type == Texture.ASPHALT:
+            #     type_val = 1
+            i = LANE_INPUTS[lev]
+            inputs[i] = 1.0 if line.texture_type == Texture.ASPHALT else 0.0
+            inputs[i + 1] = 1.0 if line.texture_type == Texture.WATER else 0.0
+            if lev < 3:
+                inputs[i + 2] = line.speed / 5.0
+
     def get_inputs(self) -> list[float]:
         """Returns a list of the inputs for the first layer of the network.
         - stagnation time (log-transformed)
@@ -120,74 +293,168 @@ class SingleSimulation:
         - 2 x-nearest vehicles for the 1st level
         - 1 x-nearest vehicle for the 2nd level
         Total: 20 inputs
+        The list is preallocated and reused: ground types and speeds are
+        kept by refresh_lane_features, only the rest is computed here.
         """
-        how_long_has_been_resting_lognormalized = (
-            -1 + 2*math.log2(self.stagnation_timer+1)/math.log2(480)
-        )
-        frogh = 0
-        if self.frog.rect.centerx - self.frog.step_size < 0:
-            frogh = -1
-        elif self.frog.rect.centerx + self.frog.step_size > SCREEN_WIDTH:
-            frogh = 1
-        inputs = [how_long_has_been_resting_lognormalized, frogh]
-        for lev, line in enumerate(self.lines):
-            # print(line.texture_type)
-            # 1. Type & Speed
-            # type_val = 0 # 0 if it's grass
-            # if line.texture_type == Texture.WATER:
-            #     type_val = -1
-            # elif line.texture_type == Texture.ASPHALT:
-            #     type_val = 1
-            is_asphalt = 1.0 if line.texture_type == Texture.ASPHALT else 0.0
-            is_water = 1.0 if line.texture_type == Texture.WATER else 0.0
-            inputs.extend([is_asphalt, is_water])
-            if lev < 3:
-                inputs.append(line.speed / 5.0)
-            
-            # 2. Closest Obstacles (finding two closest relative to frog)
-            obstacles = sorted(line.obstacles, key=lambda o: abs(o.rect.centerx - self.frog.rect.centerx))
-            how_many_obstacles = [2, 2, 1, 0, 0] # not all obstacles are measured, to save nodes
-            for i in range(how_many_obstacles[lev]):
+        inputs = self.inputs
+        plan = self.input_plan
+        if plan.resting:
+            if self.stagnation_timer < len(RESTING_LOG_TABLE):
+                inputs[0] = RESTING_LOG_TABLE[self.stagnation_timer]
+            else:
+                inputs[0] = resting_lognormalized(self.stagnation_timer)
+        if plan.edge:
+            frogh = 0
+            if self.frog.rect.centerx - self.frog.step_size < 0:
+                frogh = -1
+            elif self.frog.rect.centerx + self.frog.step_size > SCREEN_WIDTH:
+                frogh = 1
+            inputs[1] = frogh
+
+        # 2. Closest Obstacles (finding two closest relative to frog)
+        frog_x = self.frog.rect.centerx
+        for lev, first, count in plan.obstacles:
+            line = self.lines[lev]
+            # spans are (left, right), (left + right) // 2 is the rect centerx
+            spans = line.obstacle_spans()
+            distance = lambda o: abs((o[0] + o[1]) // 2 - frog_x)
+            if count == 1:
+                obstacles = [min(spans, key=distance)] if spans else []
+            else:
+                obstacles = sorted(spans, key=distance)
+            for i in range(count):
                 if i < len(obstacles):
-                    if obstacles[i].rect.centerx < self.frog.rect.centerx:
-                        rel_x = (obstacles[i].rect.right - self.frog.rect.left) / SCREEN_WIDTH
+                    left, right = obstacles[i]
+                    if (left + right) // 2 < frog_x:
+                        rel_x = (right - self.frog.rect.left) / SCREEN_WIDTH
                     else:
-                        rel_x = (obstacles[i].rect.left - self.frog.rect.right) / SCREEN_WIDTH
+                        rel_x = (left - self.frog.rect.right) / SCREEN_WIDTH
                     # rel_y = (obstacles[i].rect.centery - self.frog.rect.centery) / SCREEN_HEIGHT
-                    inputs.append(rel_x)
-                    # inputs.append(rel_y)
+                    inputs[first + i] = rel_x
                 else:
-                    inputs.append(-1.0 * line.speed)
+                    inputs[first + i] = -1.0 * line.speed
         return inputs
 
+    def input_bounds(self) -> tuple[list[float], list[float]]:
+        """Lowest and highest value each input can take from the next frame
+        on, for as long as the frog rests where it is: the resting time
+        grows up to the stagnation death, obstacles can be anywhere
+        between their spawn and despawn points, a slot can only be empty
+        (-speed) if spawns may leave the lane that short, everything else
+        stays."""
+        lows = list(self.get_inputs())
+        highs = list(lows)
+        lows[0] = RESTING_LOG_TABLE[min(self.stagnation_timer + 1, len(RESTING_LOG_TABLE) - 1)]
+        highs[0] = RESTING_LOG_TABLE[-1]
+        nearest = (-OBSTACLE_MARGIN - self.frog.rect.right) / SCREEN_WIDTH
+        farthest = (SCREEN_WIDTH + OBSTACLE_MARGIN - self.frog.rect.left) / SCREEN_WIDTH
+        for lev, first, count in OBSTACLE_INPUTS:
+            line = self.lines[lev]
+            if line.texture_type == Texture.GRASS:
+                continue # never any obstacle
+            # An obstacle stays at least `lifetime` frames and the next one
+            # comes at most `longest_gap` frames after it: once a lane holds
+            # n obstacles, it never holds fewer than lifetime // longest_gap
+            lifetime = OBSTACLE_TRAVEL // math.ceil(abs(line.speed)) - 2
+            longest_gap = line.spawn_rate + SPAWN_JITTER_MAX
+            always = min(len(line.obstacle_spans()), lifetime // longest_gap)
+            for i in range(count):
+                lows[first + i] = nearest
+                highs[first + i] = farthest
+                if i >= always: # the slot may be empty: -speed
+                    lows[first + i] = min(nearest, -1.0 * line.speed)
+                    highs[first + i] = max(farthest, -1.0 * line.speed)
+        return lows, highs
+
+    def will_rest_forever(self) -> bool:
+        """True if, whatever the inputs do within input_bounds, the network
+        keeps choosing REST (bounds propagated node by node, see
+        network_bounds, or compared directly, see always_beats)."""
+        lows, highs = self.input_bounds()
+        bounds = network_bounds(self.net, lows, highs)
+        if bounds is None:
+            return False
+        rest_low = bounds[3][0]
+        rest = self.net.output_nodes[3]
+        return all(rest_low - high > PROOF_MARGIN
+                   or always_beats(self.net, rest, key, lows, highs)
+                   for key, (_, high) in zip(self.net.output_nodes, bounds[:3]))
+
+    def retire_resting(self):
+        """Ends the game of a frog that will rest until it dies (see
+        will_rest_forever) as update() would have, frame after frame."""
+        timer = self.stagnation_timer
+        fitness = self.genome.fitness
+        skipped = 0
+        while True:
+            timer += 1
+            skipped += 1
+            self.trace.append(3)
+            if timer > self.max_stagnation_frames:
+                fitness -= 0.05
+                if timer > self.max_stagnation_frames_to_death or fitness < -5:
+                    break
+        self.frames_survived += skipped
+        self.stagnation_timer = timer
+        self.genome.fitness = fitness
+        if self.x_visits is not None:
+            self.x_visits[x_bin(self.frog.rect.centerx)] += skipped
+        self.frames_skipped = skipped - 1 # this update() stands for the first one
+        self.alive = False
+
+    def decide(self) -> int:
+        inputs = self.get_inputs()
+        output = self.net.activate(inputs)
+        decision = output.index(max(output))
+        if recorder is not None:
+            recorder.write(generation, self.genome.key, self.frames_survived,
+                           inputs, output, decision, self.distance_score)
+        return decision
+
     def update(self):
         if not self.alive:
             return
+        # A frog resting on grass can only die of stagnation: when it provably
+        # never moves again, its end is computed instead of played. Proofs
+        # cost a couple of frames: only frogs that have stood still a while,
+        # just rested and have enough frames left to skip are worth one.
+        if (prune_hopeless and self.stagnation_timer >= self.next_prune_check
+                and self.stagnation_timer <= self.max_stagnation_frames_to_death - PRUNE_FIRST_CHECK
+                and self.lines[0].texture_type == Texture.GRASS and self.frog.can_move()
+                and recorder is None and self.trace[self.frames_survived - 1] == 3):
+            if self.will_rest_forever():
+                self.retire_resting()
+                return
+            self.next_prune_check = 2 * self.stagnation_timer
         self.frames_survived += 1
         self.stagnation_timer += 1
         
         # 1. Decision Making
-        inputs = self.get_inputs()
-        output = self.net.activate(inputs)
-        decision = output.index(max(output))
+        decision = self.decide()
+        self.trace.append(decision)
         
         if decision == 0 and self.frog.can_move():
             self.frog.face_north()
             self.frog.jump()
-            self.gen.spawn_new_line(self.all_sprites)
+            self.gen.spawn_new_line()
             reorder_lines(self.lines)
+            self.refresh_lane_features()
             
             self.distance_score += 1
             self.genome.fitness += 20  # Increased reward for forward progress
             self.stagnation_timer = 0  # Reset timer because it moved forward
+            self.next_prune_check = PRUNE_FIRST_CHECK
             
         elif decision == 1:
             self.frog.move_horizontal(-1)
         elif decision == 2:
             self.frog.move_horizontal(1)
 
-        self.all_sprites.update()
+        for line in self.lines:
+            line.update()
         self.frog.update()
+        if self.x_visits is not None:
+            self.x_visits[x_bin(self.frog.rect.centerx)] += 1
         
         # 2. Death Condition: Side Edges
         # If the frog center goes off-screen, it's a death
@@ -208,91 +475,321 @@ class SingleSimulation:
 
         # 4. Standard Death Conditions (Water/Cars)
         current_lane = self.lines[0]
-        hits = pygame.sprite.spritecollide(self.frog, current_lane.obstacles, False, collided=hitbox_collision)
+        hits = current_lane.collides(self.frog.hitbox)
         self.frog.hitbox.center = self.frog.rect.center
 
         if current_lane.texture_type == Texture.WATER:
             if hits:
                 self.frog.stay_on_platform(current_lane.speed)
-            elif abs(current_lane.rect.y - current_lane.target_y) < 5:
+            elif abs(current_lane.y - current_lane.target_y) < 5:
                 self.genome.fitness -= 15 # Penalty for drowning
                 self.alive = False 
         elif current_lane.texture_type == Texture.ASPHALT and hits:
             self.genome.fitness -= 15 # Penalty for getting hit
             self.alive = False
 
+class LaneModelSimulation(SingleSimulation):
+    """Same game, lanes simulated by lane_model.LaneModel without sprites."""
+    line_type = LaneModel
+
+simulation_type = SingleSimulation # or LaneModelSimulation, set by run_neat
+pool_size: int | None = None # simulation slots, set by run_neat (None: whole population)
+headless = False # no window and no frame cap (used by sweep.py)
+frames_simulated = 0 # frog updates since the start, all generations
+allocation_profiler: AllocationProfiler | None = None # set by run_neat
+novelty_archive: NoveltyArchive | None = None # set by run_neat
+novelty_weight = 1.0 # fitness added per unit of novelty
+prune_hopeless = False # retire frogs that will never move again (SingleSimulation.retire_resting)
+prune_stats = [0, 0] # frogs retired by retire_resting, frames they skipped (this generation)
+input_stats = [0, 0] # inputs computed per frame summed over the frogs, frogs (this generation)
+
+def print_prune_report(frogs: int, skipped: int, simulated: int):
+    total = max(skipped + simulated, 1)
+    print(f"Pruned {frogs} frogs that would never move again:"
+          f" {skipped} of {skipped + simulated} frames skipped ({skipped / total:.1%})")
+
 def eval_genomes(genomes, config):
-    global generation
+    global generation, frames_simulated
     generation += 1
+    input_stats[:] = [0, 0]
+    prune_stats[:] = [0, 0]
+    frames_before = frames_simulated
+    if allocation_profiler is not None:
+        allocation_profiler.start_generation()
     pygame.init()
-    screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
-    clock = pygame.time.Clock()
+    if spectator is None and not headless:
+        screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
+        clock = pygame.time.Clock()
+        renderer = DirtyRenderer(screen, background_color=(30, 30, 30))
     
-    if generation == 1:
-        sleep(1) # This is for me for starting filming
+        if generation == 1:
+            sleep(1) # This is for me for starting filming
 
     # Initialize simulations
+    scenario = None
+    if scenario_bank is not None:
+        scenario = scenario_bank[(generation - 1) % len(scenario_bank)]
+    # With a pool only `pool_size` simulations exist at once: when a frog
+    # dies its slot (frog, rng, lines, generator) is reset in place for the
+    # next genome, so memory does not grow with the population size. Only
+    # the decision trace, which the genome keeps, and the lanes spawned
+    # while playing are new objects.
+    if pool_size is not None:
+        reset_peak_rss()
+    pending = iter(genomes)
+    tracker.reset()
+    descriptors = {} # genome key -> behaviour descriptor, with novelty_archive
     sims = []
-    for genome_id, genome in genomes:
+    for genome_id, genome in itertools.islice(pending, pool_size):
         genome.fitness = 0
-        sims.append(SingleSimulation(genome, config, seed=generation))
+        sims.append(simulation_type(genome, config, seed=generation, scenario=scenario))
+        tracker.add(sims[-1])
 
     generation_running = True
     while generation_running and len(sims) > 0:
+        # Update all active simulations, the tracker follows their changes
+        frames_simulated += len(sims)
+        survivors = []
+        for sim in sims:
+            sim.update()
+            if sim.alive:
+                tracker.update(sim)
+                survivors.append(sim)
+                continue
+            tracker.remove(sim)
+            if novelty_archive is not None:
+                descriptors[sim.genome.key] = behaviour_descriptor(sim)
+            if sim.frames_skipped:
+                prune_stats[0] += 1
+                prune_stats[1] += sim.frames_skipped
+            next_genome = next(pending, None)
+            if next_genome is not None:
+                next_genome[1].fitness = 0
+                sim.reset(next_genome[1], config, seed=generation, scenario=scenario)
+                tracker.add(sim)
+                survivors.append(sim)
+        sims = survivors
+        leader = tracker.leader
+
+        if spectator is not None:
+            # Spectator mode: no frame cap, the render thread samples the leader
+            if spectator.closed:
+                pygame.quit()
+                quit()
+            if leader is not None and spectator.wants_snapshot():
+                frogs = [sim.frog for sim in tracker.at_distance(leader.distance_score)]
+                spectator.publish(take_snapshot(leader, frogs, tracker.alive, generation))
+            continue
+        if headless:
+            continue
+
         # Handle Pygame events so window doesn't freeze
         for event in pygame.event.get():
             if event.type == pygame.QUIT:
                 pygame.quit()
                 quit()
 
-        # Update all active simulations
-        for sim in sims[:]:
-            sim.update()
-            if not sim.alive:
-                sims.remove(sim)
-
         # RENDERING (Swarm View)
-        screen.fill((30, 30, 30)) # Dark background
-        
-        if len(sims) > 0:
+        if leader is not None:
             # We draw the world of the BEST current frog as the background
-            # Sorting by fitness to find the leader
-            leader = max(sims, key=lambda s: s.genome.fitness)
-            
-            for line in leader.lines:
-                screen.blit(line.image, line.rect)
-                line.obstacles.draw(screen)
-            
-            # Draw frogs
-            for sim in sims:                
-                # Only draw if it's actually on screen
-                if sim.distance_score == leader.distance_score:
-                    sim.frog.draw(screen)
-                    if sim is leader:
-                        pygame.draw.circle(screen, (255, 215, 0), sim.frog.rect.center, 20, 2)
-
+            # Draw frogs, only if they're actually on screen
+            frogs = [sim.frog for sim in tracker.at_distance(leader.distance_score)]
+            renderer.draw(leader.lines, frogs, highlight=leader.frog.rect.center)
 
         pygame.display.set_caption(
             f"Generation: {generation}"
-            f" | Frogs Alive: {len(sims)}"
-            f" | Best Fitness: {int(leader.genome.fitness) if sims else 0}"
+            f" | Frogs Alive: {tracker.alive}"
+            f" | Best Fitness: {int(leader.genome.fitness) if leader else 0}"
+            f" | Median: {tracker.fitness_percentile(0.5) or 0}"
         )
-        pygame.display.update()
         clock.tick(FPS)
 
-def run_neat(config_file):
+    if novelty_archive is not None and descriptors:
+        scores = novelty_archive.score(descriptors)
+        for genome_id, genome in genomes:
+            genome.fitness += novelty_weight * scores[genome.key]
+        print(f"Novelty: mean {sum(scores.values()) / len(scores):.3f},"
+              f" max {max(scores.values()):.3f}, archive of {len(novelty_archive)} behaviours"
+              f" ({novelty_archive.last_seconds * 1000:.0f} ms)")
+
+    if recorder is not None:
+        recorder.flush()
+    if input_stats[1]:
+        print(f"Inputs computed per frame: {input_stats[0] / input_stats[1]:.1f}"
+              f" of {NUM_INPUTS} on average per frog")
+    if prune_hopeless:
+        print_prune_report(prune_stats[0], prune_stats[1], frames_simulated - frames_before)
+    if allocation_profiler is not None:
+        allocation_profiler.report(frames_simulated - frames_before)
+    if pool_size is not None:
+        print(f"Peak RSS: {peak_rss_mb():.1f} MB ({pool_size} simulation slots)")
+
+def run_neat(config_file, spectator_mode: bool = False,
+             trace_file: str = 'winner.trace', record_dir: str | None = None,
+             scenario_bank_file: str | None = None, lane_model: bool = False,
+             pool: int | None = None, stats_dir: str = 'neat_stats',
+             checkpoint_dir: str = 'checkpoints', checkpoint_interval: int = 5,
+             resume: str | None = None, champions_dir: str | None = None,
+             champions_changed_only: bool = False,
+             trace_allocations: int | None = None, novelty: float | None = None,
+             workers: int | None = None, prune: bool = False,
+             distance_cache: bool = False):
+    """Runs the evolution. With `spectator_mode` the frogs are simulated
+    as fast as possible and the swarm view is drawn by a separate
+    render thread at SPECTATOR_FPS. With `record_dir` every frame of every
+    frog is dumped there (see trajectory.py). With `scenario_bank_file`
+    generation n plays the n-th pre-generated world of the bank
+    (see scenario_bank.py) instead of drawing a new one. With `lane_model`
+    lanes and obstacles are simulated without pygame sprites. With `pool`
+    genomes stream through that many reusable simulations instead of
+    all being simulated at once. The statistics history is written to
+    `stats_dir` (see streaming_stats.py). Every `checkpoint_interval`
+    generations the state is saved to `checkpoint_dir`; `resume` (a
+    checkpoint file or directory) carries on from there. With
+    `champions_dir` each generation's best genome is exported there (text
+    and PNG) by a background process (see champion_export.py). With
+    `trace_allocations` the top that many allocation sites of each
+    generation are printed (see profiling.AllocationProfiler). With
+    `novelty` each genome also earns that much fitness per unit of novelty
+    of its behaviour (see novelty.py). With `workers` the games are played
+    headless by that many processes (see parallel_eval.py), each generation
+    starting while the previous one is still being reported (see pipeline.py).
+    With `prune` frogs that will never move again are retired at once with
+    the fitness they would have ended with (see SingleSimulation.retire_resting).
+    With `distance_cache` genome distances are kept across generations
+    (see speciation.CachedSpeciesSet)."""
+    global spectator, recorder, scenario_bank, simulation_type, pool_size, generation
+    global allocation_profiler, novelty_archive, novelty_weight, prune_hopeless
+    if workers is not None and (spectator_mode or record_dir is not None or novelty is not None
+                                or pool is not None or trace_allocations is not None):
+        raise ValueError("Worker processes can't be combined with the spectator,"
+                         " trajectory recording, novelty, a pool size or allocation tracing")
     config = neat.Config(neat.DefaultGenome, neat.DefaultReproduction,
                          neat.DefaultSpeciesSet, neat.DefaultStagnation,
                          config_file)
+    if distance_cache:
+        with_distance_cache(config)
 
-    p = neat.Population(config)
+    checkpoint_file = latest_checkpoint(resume) if resume is not None else None
+    if resume is not None and checkpoint_file is None:
+        raise FileNotFoundError(f"No checkpoint found in {resume}")
+    if checkpoint_file is not None:
+        p, extra = restore_checkpoint(checkpoint_file, config)
+        generation = extra["generation"]
+        novelty_archive = extra.get("novelty_archive")
+        print(f"Resuming from {checkpoint_file} (generation {p.generation})")
+    else:
+        p = neat.Population(config)
+        generation = 0
+        novelty_archive = None
+    if novelty is not None:
+        novelty_weight = novelty
+        if novelty_archive is None:
+            novelty_archive = NoveltyArchive()
+    else:
+        novelty_archive = None
     p.add_reporter(neat.StdOutReporter(True))
-    stats = neat.StatisticsReporter()
+    stats = StreamingStatisticsReporter(stats_dir, resume_at=generation if checkpoint_file else None,
+                                        background=True)
     p.add_reporter(stats)
+    checkpointer = BackgroundCheckpointer(p, checkpoint_dir, checkpoint_interval,
+                                          extra_state=lambda: {"generation": generation,
+                                                               "novelty_archive": novelty_archive})
+    p.add_reporter(checkpointer)
+    exporter = None
+    if champions_dir is not None:
+        exporter = ChampionExporter(champions_dir, changed_only=champions_changed_only)
+        p.add_reporter(exporter)
+    p.add_reporter(PopulationStatsReporter(tracker))
 
-    winner = p.run(eval_genomes, 200)
+    simulation_type = LaneModelSimulation if lane_model else SingleSimulation
+    pool_size = pool
+    prune_hopeless = prune
+    if trace_allocations is not None:
+        allocation_profiler = AllocationProfiler(top=trace_allocations)
+    if spectator_mode:
+        spectator = Spectator()
+        spectator.start()
+    if record_dir is not None:
+        recorder = TrajectoryRecorder(record_dir)
+    if scenario_bank_file is not None:
+        scenario_bank = ScenarioBank(scenario_bank_file)
+
+    if workers is None:
+        winner = p.run(eval_genomes, 200 - p.generation)
+    else:
+        # each generation plays while the previous one is reported and saved
+        evaluator = ParallelEvaluator(config_file, workers, lane_model, scenario_bank, prune=prune)
+        try:
+            winner = run_pipelined(p, evaluator, 200 - p.generation)
+        finally:
+            # workers and shared memory blocks go away whatever happened
+            evaluator.close()
+    checkpointer.wait()
+    stats.wait()
+    if exporter is not None:
+        exporter.close()
     print('\nBest genome:\n{!s}'.format(winner))
     print_genome_topology(winner, config)
+    save_trace(trace_file, winner.trace)
+    print(f"Winner's game saved to {trace_file} (replay: python froggie.py --replay {trace_file})")
+
+    if spectator is not None:
+        spectator.stop()
+        spectator = None
+    if recorder is not None:
+        recorder.close()
+        print(f"{recorder.rows} trajectory rows saved to {record_dir}")
+        recorder = None
+    if allocation_profiler is not None:
+        allocation_profiler.stop()
+        allocation_profiler = None
+    novelty_archive = None
 
 if __name__ == '__main__':
-    run_neat('neat-config.txt')
+    parser = argparse.ArgumentParser(description="Evolve Froggy Road players with NEAT")
+    parser.add_argument("--spectator", action="store_true",
+                        help="simulate uncapped and render the leader at a fixed rate")
+    parser.add_argument("--trace-file", default="winner.trace",
+                        help="where to save the winner's decisions for replay")
+    parser.add_argument("--record-trajectories", metavar="DIR", default=None,
+                        help="dump every frog's inputs/outputs/decisions per frame to DIR")
+    parser.add_argument("--scenario-bank", metavar="FILE", default=None,
+                        help="play the pre-generated worlds of FILE (see scenario_bank.py)")
+    parser.add_argument("--lane-model", action="store_true",
+                        help="simulate lanes without pygame sprites (same game, less overhead)")
+    parser.add_argument("--pool-size", type=int, default=None,
+                        help="simulate at most this many frogs at once, reusing their slots")
+    parser.add_argument("--stats-dir", default="neat_stats",
+                        help="where the per-generation statistics history is written")
+    parser.add_argument("--checkpoint-dir", default="checkpoints",
+                        help="where the evolution state is saved")
+    parser.add_argument("--checkpoint-interval", type=int, default=5,
+                        help="save the evolution state every this many generations")
+    parser.add_argument("--resume", metavar="PATH", default=None,
+                        help="carry on from a checkpoint file (or the latest in a directory)")
+    parser.add_argument("--export-champions", metavar="DIR", default=None,
+                        help="save every generation's best network (text and PNG) to DIR")
+    parser.add_argument("--champions-changed-only", action="store_true",
+                        help="export a champion only when it differs from the previous one")
+    parser.add_argument("--trace-allocations", type=int, metavar="N", default=None,
+                        help="print the N lines whose retained memory grew most in every generation (slow)")
+    parser.add_argument("--novelty", type=float, metavar="WEIGHT", default=None,
+                        help="add WEIGHT x the novelty of each frog's behaviour to its fitness")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="play the games headless in this many processes")
+    parser.add_argument("--prune-hopeless", action="store_true",
+                        help="retire at once the frogs that will never move again (same fitness)")
+    parser.add_argument("--distance-cache", action="store_true",
+                        help="keep genome distances across generations when speciating")
+    args = parser.parse_args()
+    run_neat('neat-config.txt', spectator_mode=args.spectator, trace_file=args.trace_file,
+             record_dir=args.record_trajectories, scenario_bank_file=args.scenario_bank,
+             lane_model=args.lane_model, pool=args.pool_size,
+             stats_dir=args.stats_dir, checkpoint_dir=args.checkpoint_dir,
+             checkpoint_interval=args.checkpoint_interval, resume=args.resume,
+             champions_dir=args.export_champions,
+             champions_changed_only=args.champions_changed_only,
+             trace_allocations=args.trace_allocations, novelty=args.novelty,
+             workers=args.workers, prune=args.prune_hopeless,
+             distance_cache=args.distance_cache)
@@ -1,6 +1,6 @@
 import pygame
 import neat
-import matplotlib.pyplot as plt
+# matplotlib.pyplot is imported where it is used: importing it takes ~0.7 s
 # import networkx as nx  # Optional, but makes layout 10x easier. Standard in data science.
 
 # import asyncio
@@ -83,6 +83,8 @@ def print_genome_topology(genome, config, file_path: str | None = None):
     if file_path:
         print(f"\nGenerating network graph -> {file_path}...")
         
+        import matplotlib.pyplot as plt
+
         # Create a figure without a window (headless)
         fig, ax = plt.subplots(figsize=(7, 4))
         ax.set_title(f"Winner Genome (Fit: {int(genome.fitness)})")
@@ -159,6 +161,8 @@ def print_genome_topology(genome, config, file_path: str | None = None):
 
 class LiveVisualizer:
     def __init__(self, config):
+        import matplotlib.pyplot as plt
+        self.plt = plt
         self.config = config
         self.fig, self.ax = plt.subplots(figsize=(7, 4))
         plt.ion()  # Turn on interactive mode
@@ -271,7 +275,7 @@ class LiveVisualizer:
         for node, (x, y) in pos.items():
             # Color logic
             c = 'skyblue' if node < 0 else ('orange' if node < 4 else 'lightgrey')
-            self.ax.add_patch(plt.Circle((x, y), 0.07, color=c, zorder=2))
+            self.ax.add_patch(self.plt.Circle((x, y), 0.07, color=c, zorder=2))
             
             # Label
             lbl = self.node_names.get(node, str(node))
@@ -283,7 +287,7 @@ class LiveVisualizer:
         self.ax.set_aspect('equal')
         
         # CRITICAL: This updates the window without blocking
-        plt.pause(0.005)
+        self.plt.pause(0.005)
 
 
 class SingleSimulation:
@@ -483,7 +487,7 @@ def eval_genomes(genomes, config):
                 # asyncio.run(viz.update(leader.genome))
                 viz.update(leader.genome)
             else:
-                plt.pause(0.00001)
+                viz.plt.pause(0.00001)
             
             for line in leader.lines:
                 screen.blit(line.image, line.rect)
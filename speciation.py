@@ -0,0 +1,182 @@
+import neat
+from neat.math_util import mean, stdev
+from neat.species import GenomeDistanceCache, Species
+
+def genes_signature(genome) -> int:
+    """Changes whenever a gene that counts in the distance is mutated."""
+    return hash((
+        tuple((k, n.bias, n.response, n.activation, n.aggregation) for k, n in genome.nodes.items()),
+        tuple((k, c.weight, c.enabled) for k, c in genome.connections.items()),
+    ))
+
+class PersistentDistanceCache(GenomeDistanceCache):
+    """GenomeDistanceCache kept from one generation to the next.
+
+    Elites and species representatives survive generations unchanged, so
+    their distances are reused instead of recomputed. `distances` still
+    holds only the pairs looked up in the current generation (neat reports
+    their mean); the pairs computed so far live in `known`. A genome's
+    pairs are forgotten when it leaves the population or when its genes
+    no longer match the signature taken when it was cached (mutated in place).
+    """
+    def __init__(self, config):
+        super().__init__(config)
+        self.known: dict[tuple[int, int], float] = {}
+        self._partners: dict[int, set[int]] = {} # key -> keys it has a known distance with
+        self._signatures: dict[int, int] = {}
+
+    def start_generation(self, genomes: dict):
+        """`genomes`: key -> genome of everything speciation may compare."""
+        self.distances = {}
+        self.hits = 0
+        self.misses = 0
+        for key in list(self._signatures):
+            genome = genomes.get(key)
+            if genome is None or genes_signature(genome) != self._signatures[key]:
+                self.forget(key)
+
+    def forget(self, key: int):
+        for other in self._partners.pop(key, ()):
+            self.known.pop((key, other), None)
+            self.known.pop((other, key), None)
+            if other != key:
+                self._partners[other].discard(key)
+        self._signatures.pop(key, None)
+
+    def _remember(self, genome):
+        if genome.key not in self._signatures:
+            self._signatures[genome.key] = genes_signature(genome)
+            self._partners[genome.key] = set()
+
+    def __call__(self, genome0, genome1):
+        g0 = genome0.key
+        g1 = genome1.key
+        d = self.distances.get((g0, g1))
+        if d is None:
+            d = self.known.get((g0, g1))
+            if d is None:
+                d = genome0.distance(genome1, self.config)
+                self._remember(genome0)
+                self._remember(genome1)
+                self.known[g0, g1] = d
+                self.known[g1, g0] = d
+                self._partners[g0].add(g1)
+                self._partners[g1].add(g0)
+                self.misses += 1
+            else:
+                self.hits += 1
+            self.distances[g0, g1] = d
+            self.distances[g1, g0] = d
+        else:
+            self.hits += 1
+        return d
+
+    @property
+    def cached_genomes(self) -> int:
+        return len(self._signatures)
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+class CachedSpeciesSet(neat.DefaultSpeciesSet):
+    """DefaultSpeciesSet whose genome distances are cached across generations
+    (see PersistentDistanceCache). Speciation itself is unchanged."""
+    def __init__(self, config, reporters):
+        super().__init__(config, reporters)
+        self.distance_cache = None # created with the genome config, on first speciate
+
+    def speciate(self, config, population, generation):
+        # Same as DefaultSpeciesSet.speciate, with self.distance_cache
+        assert isinstance(population, dict)
+
+        compatibility_threshold = self.species_set_config.compatibility_threshold
+
+        if self.distance_cache is None:
+            self.distance_cache = PersistentDistanceCache(config.genome_config)
+        distances = self.distance_cache
+        comparable = dict(population)
+        for s in self.species.values():
+            comparable.setdefault(s.representative.key, s.representative)
+        distances.start_generation(comparable)
+
+        # Find the best representatives for each existing species.
+        unspeciated = list(sorted(population.keys()))
+        new_representatives = {}
+        new_members = {}
+        for sid in sorted(self.species.keys()):
+            s = self.species[sid]
+            candidates = []
+            for gid in unspeciated:
+                g = population[gid]
+                d = distances(s.representative, g)
+                candidates.append((d, g))
+
+            # The new representative is the genome closest to the current representative.
+            ignored_rdist, new_rep = min(candidates, key=lambda x: x[0])
+            new_rid = new_rep.key
+            new_representatives[sid] = new_rid
+            new_members[sid] = [new_rid]
+            unspeciated.remove(new_rid)
+
+        # Partition population into species based on genetic similarity.
+        while unspeciated:
+            gid = unspeciated.pop(0)
+            g = population[gid]
+
+            # Find the species with the most similar representative.
+            candidates = []
+            for sid, rid in new_representatives.items():
+                rep = population[rid]
+                d = distances(rep, g)
+                if d < compatibility_threshold:
+                    candidates.append((d, sid))
+
+            if candidates:
+                ignored_sdist, sid = min(candidates, key=lambda x: x[0])
+                new_members[sid].append(gid)
+            else:
+                # No species is similar enough, create a new species, using
+                # this genome as its representative.
+                sid = next(self.indexer)
+                new_representatives[sid] = gid
+                new_members[sid] = [gid]
+
+        # Update species collection based on new speciation.
+        self.genome_to_species = {}
+        for sid in sorted(new_representatives.keys()):
+            rid = new_representatives[sid]
+            s = self.species.get(sid)
+            if s is None:
+                s = Species(sid, generation)
+                self.species[sid] = s
+
+            members = new_members[sid]
+            for gid in members:
+                self.genome_to_species[gid] = sid
+
+            member_dict = {gid: population[gid] for gid in members}
+            s.update(population[rid], member_dict)
+
+        # Mean and std genetic distance info report
+        if len(population) > 1:
+            gdmean = mean(distances.distances.values())
+            gdstdev = stdev(distances.distances.values())
+            self.reporters.info(
+                f'Mean genetic distance {gdmean:.3f}, standard deviation {gdstdev:.3f}')
+        self.reporters.info(
+            f'Distance cache: {distances.hits} hits, {distances.misses} computed'
+            f' ({distances.hit_rate:.1%} hit rate, {distances.cached_genomes} genomes cached)')
+
+    def __getstate__(self):
+        # the cache is rebuilt after a checkpoint is restored
+        state = super().__getstate__()
+        state['distance_cache'] = None
+        return state
+
+def with_distance_cache(config: neat.Config) -> neat.Config:
+    """Makes `config` speciate with CachedSpeciesSet. Its parameters are
+    still read from the [DefaultSpeciesSet] section of the config file."""
+    config.species_set_type = CachedSpeciesSet
+    return config
@@ -0,0 +1,106 @@
+import pygame
+from game_config import SCREEN_WIDTH, SCREEN_HEIGHT, SPECTATOR_FPS
+from sprites import Texture, get_image, load_image
+
+import threading
+
+def take_snapshot(leader, frogs, alive: int, generation: int) -> dict:
+    """Copies what the swarm view needs to draw one frame.
+    Only plain values are stored (texture types, headings, rect copies):
+    pygame surfaces cannot be blitted on one thread while another thread
+    transforms them, so the render thread owns its own images.
+    `frogs` are the Frogs to draw (those in the leader's world).
+    """
+    lanes = []
+    obstacles = []
+    for line in leader.lines:
+        lanes.append((line.texture_type, line.rect.topleft))
+        obstacles.extend(((obs.is_car, obs.speed < 0, obs.rect.width), obs.rect.copy())
+                         for obs in line.obstacles)
+    return {
+        "lanes": lanes,
+        "obstacles": obstacles,
+        "frogs": [(frog.heading, frog.rect.copy()) for frog in frogs],
+        "leader_center": leader.frog.rect.center,
+        "caption": (f"Generation: {generation}"
+                    f" | Frogs Alive: {alive}"
+                    f" | Best Fitness: {int(leader.genome.fitness)}"),
+    }
+
+class Spectator:
+    """Renders the swarm view on its own thread at a fixed frame rate.
+
+    The simulation loop runs uncapped and only builds a snapshot when
+    the render thread asks for one (see `wants_snapshot`), so watching
+    costs at most `fps` snapshots per second whatever the simulation speed.
+    Note: some platforms (macOS) only allow windows on the main thread.
+    """
+    def __init__(self, fps: int = SPECTATOR_FPS):
+        self.fps = fps
+        self.closed = False # set when the window gets closed
+        self._snapshot = None
+        self._wants_frame = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+        # Private copies of every image, made before the thread starts
+        lane_size = (SCREEN_WIDTH, int(SCREEN_HEIGHT / 5))
+        self.lane_images = {
+            Texture.GRASS: pygame.Surface(lane_size),
+            Texture.WATER: pygame.Surface(lane_size),
+            Texture.ASPHALT: load_image("assets/roadline.png",
+                                        size=(SCREEN_WIDTH, SCREEN_HEIGHT/5)),
+        }
+        self.lane_images[Texture.GRASS].fill("forestgreen")
+        self.lane_images[Texture.WATER].fill("cyan")
+        car = get_image("CAR")
+        car_left = pygame.transform.flip(car, 1, 0)
+        self.obstacle_images = {}
+        for image in (get_image("SHORTLOG"), get_image("LONGLOG")):
+            for flipped in (False, True):
+                self.obstacle_images[(False, flipped, image.get_width())] = image.copy()
+        for flipped, image in ((False, car), (True, car_left)):
+            self.obstacle_images[(True, flipped, image.get_width())] = image.copy()
+        frog = load_image("assets/frog.png", size=(32,32))
+        self.frog_images = {heading: pygame.transform.rotate(frog, heading)
+                            for heading in (0, -90, 90)}
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self.closed = True
+        self._thread.join()
+
+    def wants_snapshot(self) -> bool:
+        return self._wants_frame.is_set()
+
+    def publish(self, snapshot: dict):
+        # a reference swap is atomic, no lock needed
+        self._snapshot = snapshot
+        self._wants_frame.clear()
+
+    def _draw(self, screen: pygame.Surface, snapshot: dict):
+        screen.fill((30, 30, 30))
+        for texture, topleft in snapshot["lanes"]:
+            screen.blit(self.lane_images[texture], topleft)
+        for kind, rect in snapshot["obstacles"]:
+            screen.blit(self.obstacle_images[kind], rect)
+        for heading, rect in snapshot["frogs"]:
+            screen.blit(self.frog_images[heading], rect)
+        pygame.draw.circle(screen, (255, 215, 0), snapshot["leader_center"], 20, 2)
+        pygame.display.set_caption(snapshot["caption"])
+
+    def _run(self):
+        pygame.init()
+        screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
+        clock = pygame.time.Clock()
+        while not self.closed:
+            for event in pygame.event.get():
+                if event.type == pygame.QUIT:
+                    self.closed = True
+            self._wants_frame.set()
+            if self._snapshot is not None:
+                self._draw(screen, self._snapshot)
+            pygame.display.update()
+            clock.tick(self.fps)
+        pygame.display.quit()
@@ -18,31 +18,74 @@ def load_image(path: str,
         img = pygame.transform.scale(img, size)
     return img
 
-ASPHALT_TEXTURE = load_image("assets/roadline.png", 
-                             size=(SCREEN_WIDTH, SCREEN_HEIGHT/5))
-CAR = load_image("assets/cars/Sport/sport_red.png", 
-                 size=(64, 0.6*SCREEN_HEIGHT/5), rotation=-90)
-TRUCK = load_image("assets/cars/Truck/truck_blue.png", 
-                 size=(90, 0.8*SCREEN_HEIGHT/5), rotation=-90)
-SHORTLOG = load_image("assets/short-log.png", size=(72, 36))
-LONGLOG = load_image("assets/long-log.png", size=(108, 36))
+# Images are decoded the first time they are used rather than at import,
+# so headless workers that never draw don't pay for them.
+# sprites.CAR & co. still work (see __getattr__)
+_IMAGE_FILES = {
+    "ASPHALT_TEXTURE": ("assets/roadline.png", (SCREEN_WIDTH, SCREEN_HEIGHT/5), 0),
+    "CAR": ("assets/cars/Sport/sport_red.png", (64, 0.6*SCREEN_HEIGHT/5), -90),
+    "TRUCK": ("assets/cars/Truck/truck_blue.png", (90, 0.8*SCREEN_HEIGHT/5), -90),
+    "SHORTLOG": ("assets/short-log.png", (72, 36), 0),
+    "LONGLOG": ("assets/long-log.png", (108, 36), 0),
+    "FROG": ("assets/frog.png", (32, 32), 0),
+}
+# Plain lanes are a flat color
+_LANE_FILLS = {
+    "GRASS_TEXTURE": "forestgreen",
+    "WATER_TEXTURE": "cyan",
+}
+# Mirror images of the above
+_FLIPPED = {
+    "CAR_LEFT": "CAR",
+}
+_images: dict[str, pygame.Surface] = {}
+
+# These surfaces are shared by every sprite using them: never draw on them
+def get_image(name: str) -> pygame.Surface:
+    if name not in _images:
+        if name in _LANE_FILLS:
+            _images[name] = pygame.Surface((SCREEN_WIDTH, int(SCREEN_HEIGHT / 5)))
+            _images[name].fill(_LANE_FILLS[name])
+        elif name in _FLIPPED:
+            _images[name] = pygame.transform.flip(get_image(_FLIPPED[name]), 1, 0)
+        else:
+            path, size, rotation = _IMAGE_FILES[name]
+            _images[name] = load_image(path, size=size, rotation=rotation)
+    return _images[name]
+
+def frog_image(heading: int) -> pygame.Surface:
+    """The frog facing `heading` (0 north, -90 right, 90 left)."""
+    if heading == 0:
+        return get_image("FROG")
+    name = f"FROG_{heading}"
+    if name not in _images:
+        _images[name] = pygame.transform.rotate(get_image("FROG"), heading)
+    return _images[name]
+
+def __getattr__(name: str):
+    if name in _IMAGE_FILES or name in _LANE_FILLS or name in _FLIPPED:
+        return get_image(name)
+    raise AttributeError(f"module 'sprites' has no attribute {name!r}")
 
 class Frog(pygame.sprite.Sprite):
     def __init__(self):
         super().__init__()
-        self.original_image = load_image("assets/frog.png", size=(32,32))
-        self.image = self.original_image
-        self.rect = self.image.get_rect()
-        self.rect.center = (SCREEN_WIDTH/2, SCREEN_HEIGHT-42)
-
+        self.original_image = get_image("FROG")
         # Cooldown attributes
         # self.move_cooldown = 300  # 0.3 seconds in milliseconds
         # self.last_move_time = pygame.time.get_ticks()
-        self.move_cooldown = 0
         self.cooldown_duration = 15
-        self.hitbox = pygame.Rect(0, 0, 16, 16) # it's where collision actually happens
-
         self.step_size = SCREEN_WIDTH / 16 # for horizontal moving
+        self.reset()
+
+    def reset(self):
+        """Back to the starting position, so a Frog can be reused."""
+        self.image = self.original_image
+        self.heading = 0 # rotation of the image: 0 north, -90 right, 90 left
+        self.rect = self.image.get_rect()
+        self.rect.center = (SCREEN_WIDTH/2, SCREEN_HEIGHT-42)
+        self.move_cooldown = 0
+        self.hitbox = pygame.Rect(0, 0, 16, 16) # it's where collision actually happens
 
     def can_move(self):
         # current_time = pygame.time.get_ticks()
@@ -70,10 +113,11 @@ class Frog(pygame.sprite.Sprite):
             # Rotate sprite (Optional: use pygame.transform.rotate)
             if direction > 0:
                 # Face Right
-                self.image = pygame.transform.rotate(self.original_image, -90)
+                self.heading = -90
             else:
                 # Face Left
-                self.image = pygame.transform.rotate(self.original_image, 90)
+                self.heading = 90
+            self.image = frog_image(self.heading)
             
             # self.last_move_time = pygame.time.get_ticks()
     
@@ -82,6 +126,7 @@ class Frog(pygame.sprite.Sprite):
         # self.last_move_time = pygame.time.get_ticks()
 
     def face_north(self):
+        self.heading = 0
         self.image = self.original_image
 
     def stay_on_platform(self, platform_speed):
@@ -106,17 +151,18 @@ class Frog(pygame.sprite.Sprite):
 
 
 class Obstacle(pygame.sprite.Sprite):
-    def __init__(self, x, y, speed, is_car=True):
+    def __init__(self, x, y, speed, is_car=True, rng=None):
         super().__init__()
         self.speed = speed
         self.is_car = is_car # True for Car, False for Log
         
         if is_car:
             # Reuse your car sprite logic here
-            self.image = pygame.transform.flip(CAR, 1, 0) if speed < 0 else CAR
+            self.image = get_image("CAR_LEFT" if speed < 0 else "CAR")
         else:
             # Create a log shape using built-in rect
-            self.image =  random.choice([SHORTLOG, LONGLOG])
+            # The lane's rng keeps seeded worlds reproducible
+            self.image = (random if rng is None else rng).choice([get_image("SHORTLOG"), get_image("LONGLOG")])
             
         self.rect = self.image.get_rect(center=(x, y))
 
@@ -136,10 +182,31 @@ class Obstacle(pygame.sprite.Sprite):
 
 
 
+CAR_SPEEDS = [-3, -2, 2, 3]
+LOG_SPEEDS = [-1.75, -1.5, -1.25, 1.25, 1.5, 1.75] # Logs move slower
+
+def spawn_rate_for(texture: Texture, progress: int) -> int:
+    """Frames between two spawns of a lane created after `progress` steps."""
+    if texture == Texture.ASPHALT:
+        return round(max(60, 150 - (progress * 0.6)))
+        # round(max(800, 2500 - (progress * 10)) * FPS / 1000)
+    elif texture == Texture.WATER:
+        return round(min(270, 108 + (progress * 1.2)))
+        # round(min(5000, 1800 + (progress * 20)) * FPS / 1000) # Cap at 5s
+    return 0
+
 class Line(pygame.sprite.Sprite):
     def __init__(self, texture: Texture = Texture.GRASS, 
-                 progress: int = 0, rng = None):
+                 progress: int = 0, rng = None, plan = None):
         super().__init__()
+        ## Line is responsible for the cars/logs spawning
+        self.obstacles = pygame.sprite.Group()
+        self.reset(texture, progress, rng, plan)
+
+    def reset(self, texture: Texture = Texture.GRASS,
+              progress: int = 0, rng = None, plan = None):
+        """Turns this line into a new one, as if just created (same rng draws)."""
+        self.obstacles.empty()
         self.size = (SCREEN_WIDTH, int(SCREEN_HEIGHT / 5))
         self.texture_type = texture
         self.safe_ground = True
@@ -154,20 +221,16 @@ class Line(pygame.sprite.Sprite):
         self.target_y = 0
 
         self.rng = random if rng is None else rng
-        ## Line is responsible for the cars/logs spawning
-        self.obstacles = pygame.sprite.Group()
+        # a scenario_bank.LanePlan: pre-generated speed, spawn jitters and logs
+        self.plan = plan
 
         if texture == Texture.ASPHALT:
-            self.speed = self.rng.choice([-3, -2, 2, 3])
-            self.spawn_rate = round(max(60, 150 - (progress * 0.6)))
-            # round(max(800, 2500 - (progress * 10)) * FPS / 1000)
+            self.speed = self.rng.choice(CAR_SPEEDS) if plan is None else plan.speed
         elif texture == Texture.WATER:
-            self.speed = self.rng.choice([-1.75, -1.5, -1.25, 1.25, 1.5, 1.75]) # Logs move slower
-            self.spawn_rate = round(min(270, 108 + (progress * 1.2)))
-            # round(min(5000, 1800 + (progress * 20)) * FPS / 1000) # Cap at 5s
+            self.speed = self.rng.choice(LOG_SPEEDS) if plan is None else plan.speed
         else: 
             self.speed = 0
-            self.spawn_rate = 0
+        self.spawn_rate = spawn_rate_for(texture, progress)
         self.spawn_timer = 0
         self.last_spawn_time = pygame.time.get_ticks()
 
@@ -178,27 +241,43 @@ class Line(pygame.sprite.Sprite):
         """
         spacing = SCREEN_WIDTH / 2
         for i in range(2):
-            obs = Obstacle(i * spacing + self.rng.randint(0, 15), self.rect.y, self.speed, is_car)
+            obs = Obstacle(i * spacing + self.rng.randint(0, 15), self.rect.y, self.speed, is_car,
+                           rng=self.rng)
             self.obstacles.add(obs)
 
     def _spawn_single_obstacle(self):
         # Start at the edge based on speed direction
         x_start = -100 if self.speed > 0 else SCREEN_WIDTH + 100
         is_car = (self.texture_type == Texture.ASPHALT)
-        new_obs = Obstacle(x_start, self.rect.y, self.speed, is_car)
+        new_obs = Obstacle(x_start, self.rect.y, self.speed, is_car,
+                           rng=self.rng if self.plan is None else self.plan)
         self.obstacles.add(new_obs)
  
     def __load_road(self):
-        self.image = ASPHALT_TEXTURE
+        self.image = get_image("ASPHALT_TEXTURE")
         self.rect = self.image.get_rect()
 
     def __load_river(self):
-        self.image = pygame.Surface(self.size)
-        self.image.fill("cyan")
+        self.image = get_image("WATER_TEXTURE")
 
     def __load_grass(self):
-        self.image = pygame.Surface(self.size)
-        self.image.fill("forestgreen")
+        self.image = get_image("GRASS_TEXTURE")
+
+    # Interface shared with lane_model.LaneModel, used by the simulations
+    @property
+    def y(self) -> int:
+        return self.rect.y
+
+    @y.setter
+    def y(self, value: int):
+        self.rect.y = value
+
+    def obstacle_spans(self) -> list[tuple[int, int]]:
+        """(left, right) of every obstacle, oldest first."""
+        return [(obs.rect.left, obs.rect.right) for obs in self.obstacles]
+
+    def collides(self, hitbox: pygame.Rect) -> bool:
+        return any(hitbox.colliderect(obs.rect) for obs in self.obstacles)
 
     def goto_level(self, level: int):
         """"0th level: go to the bottom, 4th level: go to the top"""
@@ -229,7 +308,10 @@ class Line(pygame.sprite.Sprite):
                 # Reset the timer. 
                 # Note: You should adjust spawn_rate in __init__ to be 
                 # a number of frames (e.g., 60 to 180) instead of ms.
-                self.spawn_timer = self.spawn_rate + self.rng.randint(-5, 20)
+                if self.plan is None:
+                    self.spawn_timer = self.spawn_rate + self.rng.randint(-5, 20)
+                else:
+                    self.spawn_timer = self.spawn_rate + self.plan.next_jitter()
 
         # 3. Update existing obstacles
         # Pass the current lane Y so obstacles stay aligned with the sliding lane
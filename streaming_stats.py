@@ -0,0 +1,294 @@
+import neat
+from neat.math_util import mean, stdev, median2
+
+import collections
+import collections.abc
+import copy
+import csv
+import heapq
+import itertools
+import json
+import os
+import pickle
+import threading
+
+class LazyHistory(collections.abc.Sequence):
+    """One item per generation, read from one of the reporter's files as a
+    read-only sequence. Only the byte offset of each item is in memory,
+    an item is read back from disk whenever it is accessed."""
+    def __init__(self, offsets: list[int], read_at, iterate):
+        self._offsets = offsets
+        self._read_at = read_at # offset -> item
+        self._iterate = iterate # -> iterator over every item, in order
+
+    def __len__(self) -> int:
+        return len(self._offsets)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        if not -len(self._offsets) <= index < len(self._offsets):
+            raise IndexError("generation out of range")
+        return self._read_at(self._offsets[index])
+
+    def __iter__(self):
+        return self._iterate()
+
+class StreamingStatisticsReporter(neat.reporting.BaseReporter):
+    """Drop-in replacement for neat.StatisticsReporter whose memory does not
+    grow with the number of generations.
+
+    In memory: the last `window` generation summaries, the `keep_best`
+    fittest genomes and a few running aggregates. On disk, in `directory`:
+    - generations.jsonl: one line per generation with its summary and the
+      fitness of every member of every species
+    - best_genomes.pickle: the best genome of every generation, pickled
+      one after the other
+    Queries over the whole run (get_fitness_mean, get_species_sizes, save...)
+    stream these files back, so they return the same as StatisticsReporter.
+    With `resume_at` the files of a previous run are kept up to that
+    generation and appended to. With `background` each generation is
+    serialized on the calling thread but written by a background thread,
+    reading the history back waits for the pending write.
+    """
+    def __init__(self, directory: str = "neat_stats", window: int = 100,
+                 keep_best: int = 10, resume_at: int | None = None,
+                 background: bool = False):
+        self.directory = directory
+        self.background = background
+        self._writer = None
+        self._write_error = None # raised again by wait()
+        self.keep_best = keep_best
+        self.recent = collections.deque(maxlen=window) # latest generation summaries
+        self._best = [] # min-heap of (fitness, -generation, genome), at most keep_best
+        self.generations = 0
+        self.max_species = 0
+        self.best_fitness = None
+        # where each generation starts in generations.jsonl and best_genomes.pickle
+        self._history_offsets = []
+        self._history_end = 0
+        self._genome_offsets = []
+        self._genomes_end = 0
+        os.makedirs(directory, exist_ok=True)
+        self._history_path = os.path.join(directory, "generations.jsonl")
+        self._genomes_path = os.path.join(directory, "best_genomes.pickle")
+        if resume_at is not None:
+            self._reload(resume_at)
+        else:
+            open(self._history_path, "w").close()
+            open(self._genomes_path, "wb").close()
+
+    def _reload(self, generations: int):
+        """Rebuilds the in-memory part from the files of a previous run,
+        keeping its first `generations` generations only (those of the
+        checkpoint being resumed). The files are copied row by row to
+        temporary files, which then replace them."""
+        temporary = self._history_path + ".tmp"
+        with open(temporary, "w", newline="\n") as f:
+            for row in itertools.islice(self._iter_history(), generations):
+                line = json.dumps(row) + "\n"
+                f.write(line)
+                self._history_offsets.append(self._history_end)
+                self._history_end += len(line) # json.dumps only writes ASCII
+                self._remember(row)
+        os.replace(temporary, self._history_path)
+        temporary = self._genomes_path + ".tmp"
+        with open(temporary, "wb") as f:
+            for generation, genome in enumerate(itertools.islice(self._iter_genomes(), generations)):
+                self._genome_offsets.append(f.tell())
+                pickle.dump(genome, f)
+                self._keep(generation, genome)
+            self._genomes_end = f.tell()
+        os.replace(temporary, self._genomes_path)
+
+    def _remember(self, row: dict):
+        self.recent.append({k: v for k, v in row.items() if k != "species"})
+        self.generations += 1
+        if row["species"]:
+            self.max_species = max(self.max_species, max(int(sid) for sid in row["species"]))
+        if self.best_fitness is None or row["best_fitness"] > self.best_fitness:
+            self.best_fitness = row["best_fitness"]
+
+    def _keep(self, generation: int, genome):
+        entry = (genome.fitness, -generation, genome) # earlier wins ties
+        if len(self._best) < self.keep_best:
+            heapq.heappush(self._best, entry)
+        elif entry[:2] > self._best[0][:2]:
+            heapq.heapreplace(self._best, entry)
+
+    def post_evaluate(self, config, population, species, best_genome):
+        species_stats = {sid: {k: v.fitness for k, v in s.members.items()}
+                         for sid, s in species.species.items()}
+        scores = [f for members in species_stats.values() for f in members.values()]
+        row = {
+            "generation": self.generations,
+            "best_key": best_genome.key,
+            "best_fitness": best_genome.fitness,
+            "mean": mean(scores),
+            "stdev": stdev(scores),
+            "median": median2(scores),
+            "species": species_stats,
+        }
+        line = json.dumps(row) + "\n"
+        genome = copy.deepcopy(best_genome)
+        raw = pickle.dumps(genome)
+        self._history_offsets.append(self._history_end)
+        self._history_end += len(line)
+        self._genome_offsets.append(self._genomes_end)
+        self._genomes_end += len(raw)
+        self.wait() # one write at a time, in order
+        if self.background:
+            self._writer = threading.Thread(target=self._append, args=(line, raw))
+            self._writer.start()
+        else:
+            self._append(line, raw)
+        self._keep(self.generations, genome)
+        self._remember(row)
+
+    def _append(self, line: str, raw: bytes):
+        try:
+            with open(self._history_path, "a", newline="\n") as f:
+                f.write(line)
+            with open(self._genomes_path, "ab") as f:
+                f.write(raw)
+        except Exception as error:
+            if not self.background:
+                raise
+            self._write_error = error
+
+    def wait(self):
+        """Waits for the pending background write, if any, and raises the
+        error it failed with."""
+        if self._writer is not None:
+            self._writer.join()
+            self._writer = None
+        if self._write_error is not None:
+            error, self._write_error = self._write_error, None
+            raise error
+
+    # --- Reading the history back ---
+    def _iter_history(self):
+        self.wait()
+        with open(self._history_path) as f:
+            for line in f:
+                yield json.loads(line)
+
+    def _iter_genomes(self):
+        self.wait()
+        with open(self._genomes_path, "rb") as f:
+            while True:
+                try:
+                    yield pickle.load(f)
+                except EOFError:
+                    return
+
+    def _genome_at(self, offset: int):
+        self.wait()
+        with open(self._genomes_path, "rb") as f:
+            f.seek(offset)
+            return pickle.load(f)
+
+    @property
+    def most_fit_genomes(self) -> LazyHistory:
+        """Best genome of each generation, a sequence read lazily from disk."""
+        return LazyHistory(self._genome_offsets, self._genome_at, self._iter_genomes)
+
+    @staticmethod
+    def _species_stats(row: dict) -> dict:
+        return {int(sid): {int(k): v for k, v in members.items()}
+                for sid, members in row["species"].items()}
+
+    def _species_stats_at(self, offset: int) -> dict:
+        self.wait()
+        with open(self._history_path, "rb") as f:
+            f.seek(offset)
+            return self._species_stats(json.loads(f.readline()))
+
+    def _iter_species_stats(self):
+        for row in self._iter_history():
+            yield self._species_stats(row)
+
+    @property
+    def generation_statistics(self) -> LazyHistory:
+        """{species id: {genome id: fitness}} of each generation, a sequence
+        read lazily from disk."""
+        return LazyHistory(self._history_offsets, self._species_stats_at,
+                           self._iter_species_stats)
+
+    def get_fitness_stat(self, f):
+        stat = []
+        for stats in self.generation_statistics:
+            stat.append(f([v for members in stats.values() for v in members.values()]))
+        return stat
+
+    def _column(self, name: str) -> list:
+        return [row[name] for row in self._iter_history()]
+
+    def get_fitness_mean(self):
+        """Get the per-generation mean fitness."""
+        return self._column("mean")
+
+    def get_fitness_stdev(self):
+        """Get the per-generation standard deviation of the fitness."""
+        return self._column("stdev")
+
+    def get_fitness_median(self):
+        """Get the per-generation median fitness."""
+        return self._column("median")
+
+    def best_unique_genomes(self, n):
+        """Returns the most n fit genomes, with no duplication."""
+        best_unique = {}
+        for g in self.most_fit_genomes:
+            best_unique[g.key] = g
+        return sorted(best_unique.values(), key=lambda g: g.fitness, reverse=True)[:n]
+
+    def best_genomes(self, n):
+        """Returns the n most fit genomes ever seen."""
+        if n <= self.keep_best:
+            return [g for _, _, g in sorted(self._best, key=lambda e: (-e[0], -e[1]))][:n]
+        return sorted(self.most_fit_genomes, key=lambda g: g.fitness, reverse=True)[:n]
+
+    def best_genome(self):
+        """Returns the most fit genome ever seen."""
+        return self.best_genomes(1)[0]
+
+    def save(self):
+        self.save_genome_fitness()
+        self.save_species_count()
+        self.save_species_fitness()
+
+    def save_genome_fitness(self, delimiter=' ', filename='fitness_history.csv'):
+        """ Saves the population's best and average fitness. """
+        with open(filename, 'w') as f:
+            w = csv.writer(f, delimiter=delimiter)
+            for row in self._iter_history():
+                w.writerow([row["best_fitness"], row["mean"]])
+
+    def save_species_count(self, delimiter=' ', filename='speciation.csv'):
+        """ Log speciation throughout evolution. """
+        with open(filename, 'w') as f:
+            w = csv.writer(f, delimiter=delimiter)
+            for s in self.get_species_sizes():
+                w.writerow(s)
+
+    def save_species_fitness(self, delimiter=' ', null_value='NA', filename='species_fitness.csv'):
+        """ Log species' average fitness throughout evolution. """
+        with open(filename, 'w') as f:
+            w = csv.writer(f, delimiter=delimiter)
+            for s in self.get_species_fitness(null_value):
+                w.writerow(s)
+
+    def get_species_sizes(self):
+        return [[len(gen_data.get(sid, [])) for sid in range(1, self.max_species + 1)]
+                for gen_data in self.generation_statistics]
+
+    def get_species_fitness(self, null_value=''):
+        species_fitness = []
+        for gen_data in self.generation_statistics:
+            fitness = []
+            for sid in range(1, self.max_species + 1):
+                members = gen_data.get(sid)
+                fitness.append(mean(members.values()) if members else null_value)
+            species_fitness.append(fitness)
+        return species_fitness
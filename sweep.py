@@ -0,0 +1,141 @@
+import argparse
+import concurrent.futures
+import configparser
+import csv
+import itertools
+import multiprocessing
+import os
+import random
+import tempfile
+import time
+
+def parse_values(text: str) -> tuple[str, list[str]]:
+    """'pop_size=50,100' -> ('pop_size', ['50', '100'])"""
+    key, _, values = text.partition("=")
+    if not values:
+        raise argparse.ArgumentTypeError(f"expected key=value[,value...], got {text!r}")
+    return key.strip(), [v.strip() for v in values.split(",")]
+
+def find_section(parser: configparser.ConfigParser, key: str) -> tuple[str, str]:
+    """Accepts 'section.key' or a bare key, which must appear in one section only."""
+    if "." in key:
+        section, key = key.split(".", 1)
+        if not parser.has_option(section, key):
+            raise KeyError(f"{section}.{key} is not in the config")
+        return section, key
+    sections = [s for s in parser.sections() if parser.has_option(s, key)]
+    if len(sections) != 1:
+        raise KeyError(f"{key} is in sections {sections}, use section.key")
+    return sections[0], key
+
+def write_variant(base_config: str, overrides: dict[str, str], path: str):
+    parser = configparser.ConfigParser()
+    parser.read(base_config)
+    for key, value in overrides.items():
+        section, option = find_section(parser, key)
+        parser.set(section, option, value)
+    with open(path, "w") as f:
+        parser.write(f)
+
+def grid(space: dict[str, list[str]]) -> list[dict[str, str]]:
+    keys = list(space)
+    return [dict(zip(keys, values)) for values in itertools.product(*space.values())]
+
+def random_search(space: dict[str, list[str]], n: int, seed: int = 0) -> list[dict[str, str]]:
+    """n distinct points of the grid (all of it if it is smaller)."""
+    points = grid(space)
+    return random.Random(seed).sample(points, min(n, len(points)))
+
+def run_job(config_file: str, seed: int, generations: int, lane_model: bool,
+            distance_cache: bool = False) -> dict:
+    """One headless evolution, in its own process."""
+    os.environ["SDL_VIDEODRIVER"] = "dummy"
+    os.environ["PYGAME_HIDE_SUPPORT_PROMPT"] = "1"
+    import neat
+    import simulation
+    from speciation import with_distance_cache
+
+    simulation.headless = True
+    simulation.simulation_type = (simulation.LaneModelSimulation if lane_model
+                                  else simulation.SingleSimulation)
+    config = neat.Config(neat.DefaultGenome, neat.DefaultReproduction,
+                         neat.DefaultSpeciesSet, neat.DefaultStagnation,
+                         config_file)
+    if distance_cache:
+        with_distance_cache(config)
+    p = neat.Population(config, seed=seed)
+    start = time.perf_counter()
+    winner = p.run(simulation.eval_genomes, generations)
+    return {
+        "best_fitness": winner.fitness,
+        "generations": simulation.generation,
+        "wall_time": round(time.perf_counter() - start, 2),
+        "frames": simulation.frames_simulated,
+    }
+
+def sweep(base_config: str, points: list[dict[str, str]], seeds: list[int],
+          generations: int, jobs: int, out: str, lane_model: bool = False,
+          distance_cache: bool = False) -> list[dict]:
+    """Runs every point with every seed, at most `jobs` processes at once.
+    Rows are appended to the `out` CSV as soon as each job finishes."""
+    keys = list(points[0]) if points else []
+    fields = keys + ["seed", "best_fitness", "generations", "wall_time", "frames"]
+    rows = []
+    with tempfile.TemporaryDirectory() as tmp, open(out, "w", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=fields)
+        writer.writeheader()
+        # spawn: a fresh interpreter per worker, no pygame state inherited
+        context = multiprocessing.get_context("spawn")
+        # one job per process, so simulation's module globals start clean
+        with concurrent.futures.ProcessPoolExecutor(max_workers=jobs, mp_context=context,
+                                                    max_tasks_per_child=1) as executor:
+            futures = {}
+            for i, point in enumerate(points):
+                config_file = os.path.join(tmp, f"config_{i}.txt")
+                write_variant(base_config, point, config_file)
+                for seed in seeds:
+                    future = executor.submit(run_job, config_file, seed, generations, lane_model,
+                                             distance_cache)
+                    futures[future] = dict(point, seed=seed)
+            for future in concurrent.futures.as_completed(futures):
+                row = dict(futures[future], **future.result())
+                writer.writerow(row)
+                f.flush()
+                rows.append(row)
+                print(" ".join(f"{k}={v}" for k, v in row.items()))
+    return rows
+
+def print_table(rows: list[dict]):
+    """Best fitness first, with frames per second of wall time."""
+    if not rows:
+        return
+    rows = sorted(rows, key=lambda r: r["best_fitness"], reverse=True)
+    columns = list(rows[0]) + ["frames/s"]
+    cells = [[str(r[c]) for c in columns[:-1]] + [f"{r['frames'] / max(r['wall_time'], 1e-9):.0f}"]
+             for r in rows]
+    widths = [max(len(c), *(len(row[i]) for row in cells)) for i, c in enumerate(columns)]
+    for row in [columns] + cells:
+        print("  ".join(v.ljust(w) for v, w in zip(row, widths)).rstrip())
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Run headless evolutions over neat-config variants")
+    parser.add_argument("--set", dest="space", action="append", type=parse_values, default=[],
+                        metavar="KEY=V1,V2", help="values to try for a config key (section.key if ambiguous)")
+    parser.add_argument("--random", type=int, default=None, metavar="N",
+                        help="try N random points of the grid instead of all of them")
+    parser.add_argument("--config", default="neat-config.txt")
+    parser.add_argument("--seeds", type=int, nargs="+", default=[0])
+    parser.add_argument("--generations", type=int, default=20)
+    parser.add_argument("--jobs", type=int, default=os.cpu_count())
+    parser.add_argument("--lane-model", action="store_true")
+    parser.add_argument("--distance-cache", action="store_true",
+                        help="keep genome distances across generations when speciating")
+    parser.add_argument("--out", default="sweep_results.csv")
+    args = parser.parse_args()
+
+    space = dict(args.space)
+    points = grid(space) if args.random is None else random_search(space, args.random)
+    rows = sweep(args.config, points, args.seeds, args.generations, args.jobs, args.out,
+                 args.lane_model, args.distance_cache)
+    print()
+    print_table(rows)
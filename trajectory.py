@@ -0,0 +1,77 @@
+import numpy as np
+
+import json
+import os
+
+CHUNK_ROWS = 1 << 20 # rows per .npy file (~120 MB)
+
+# One row per frog per frame
+ROW_DTYPE = np.dtype([
+    ("generation", "<u4"),
+    ("genome_id", "<i8"),
+    ("frame", "<u4"),
+    ("inputs", "<f4", (20,)), # as built by SingleSimulation.get_inputs
+    ("outputs", "<f4", (4,)),
+    ("decision", "u1"), # 0 FORWARD, 1 LEFT, 2 RIGHT, 3 REST
+    ("lane", "<u4"), # lanes crossed so far (distance_score)
+])
+
+class TrajectoryRecorder:
+    """Writes every frame of every frog into preallocated .npy memmaps.
+
+    Rows go straight into chunk files of CHUNK_ROWS rows each, no Python
+    list is ever built, so memory stays flat however long the run is.
+    The number of rows actually written in each chunk is kept in index.json.
+    """
+    def __init__(self, directory: str, chunk_rows: int = CHUNK_ROWS):
+        self.directory = directory
+        self.chunk_rows = chunk_rows
+        self.chunk_sizes: list[int] = []
+        self._chunk = None
+        self._row = 0
+        os.makedirs(directory, exist_ok=True)
+
+    def _next_chunk(self):
+        self._close_chunk()
+        path = os.path.join(self.directory, f"chunk_{len(self.chunk_sizes):05d}.npy")
+        self._chunk = np.lib.format.open_memmap(path, mode="w+", dtype=ROW_DTYPE,
+                                                shape=(self.chunk_rows,))
+        self.chunk_sizes.append(0)
+        self._row = 0
+
+    def _close_chunk(self):
+        self.flush()
+        self._chunk = None
+
+    def _write_index(self):
+        with open(os.path.join(self.directory, "index.json"), "w") as f:
+            json.dump({"chunk_rows": self.chunk_rows, "chunk_sizes": self.chunk_sizes}, f)
+
+    def write(self, generation: int, genome_id: int, frame: int,
+              inputs: list[float], outputs: list[float], decision: int, lane: int):
+        if self._chunk is None or self._row == self.chunk_rows:
+            self._next_chunk()
+        self._chunk[self._row] = (generation, genome_id, frame, inputs, outputs, decision, lane)
+        self._row += 1
+
+    def flush(self):
+        """Makes the rows written so far durable and visible to the loader."""
+        if self._chunk is not None:
+            self._chunk.flush()
+            self.chunk_sizes[-1] = self._row
+            self._write_index()
+
+    @property
+    def rows(self) -> int:
+        return sum(self.chunk_sizes[:-1]) + self._row if self.chunk_sizes else 0
+
+    def close(self):
+        self._close_chunk()
+
+def load_trajectories(directory: str) -> list[np.ndarray]:
+    """Returns one read-only memmap per chunk, trimmed to the rows written.
+    Nothing is copied: columns are views, e.g. `chunk["inputs"][:, 3]`."""
+    with open(os.path.join(directory, "index.json")) as f:
+        index = json.load(f)
+    return [np.load(os.path.join(directory, f"chunk_{i:05d}.npy"), mmap_mode="r")[:size]
+            for i, size in enumerate(index["chunk_sizes"])]